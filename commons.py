@@ -223,6 +223,7 @@ class IntRange(object):
     """
     数字范围
     """
+    __slots__ = ("start", "end")
 
     def __init__(self, start: int, end: int):
         self.start = start
@@ -817,6 +818,8 @@ class Netcat(object):
 
 # region 表示尺寸
 class Size(object):
+    __slots__ = ("width", "height", "ratio")
+
     def __init__(self, width: int, height: int, ratio: str = None):
         self.width = width
         """宽度"""
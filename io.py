@@ -1,4 +1,5 @@
 import datetime
+import functools
 import http.server
 import json
 import os.path
@@ -6,15 +7,15 @@ import shutil
 import socketserver
 import textwrap
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from pathlib import Path as PathlibPath
-from typing import TypeVar, Type, Optional, Union
+from typing import TypeVar, Type, Optional, Union, TYPE_CHECKING
 
-import docker
+import pydantic_core
 import pysubs2
 import yaml
 from addict import Dict
-from docker import DockerClient
 from jsonpath_ng import parse
 from langdetect import detect, LangDetectException
 from loguru import logger
@@ -24,6 +25,9 @@ from pysubs2 import SSAEvent
 from pyext.commons import CommandLine, Size
 from pyext.exceptions import parse_exceptions
 
+if TYPE_CHECKING:
+    from docker import DockerClient
+
 TF = TypeVar("TF", bound="File")
 TPM = TypeVar("TPM", bound=BaseModel)
 TAF = TypeVar("TAF", bound="AudioFile")
@@ -150,6 +154,8 @@ class Aeneas(object):
 
         """
         try:
+            # docker客户端导入较慢,只在需要运行aeneas时加载
+            import docker
             docker_client = docker.from_env()
             logger.info("使用Docker运行aeneas")
             return DockerAeneas(docker_client)
@@ -248,7 +254,7 @@ class LocalAeneas(Aeneas):
 
 class DockerAeneas(Aeneas):
     def __init__(
-            self, docker_client: DockerClient, aeneas_image: str = "dongjak/aeneas"
+            self, docker_client: "DockerClient", aeneas_image: str = "dongjak/aeneas"
     ):
         """
         使用Docker运行aeneas
@@ -350,6 +356,32 @@ class File(object):
         with self.path.open("w", encoding="utf-8") as f:
             f.write(content)
 
+    def write_bytes(self, content: bytes):
+        """
+        写入二进制内容到该文件中
+
+        Args:
+            content: 二进制内容
+        """
+        # 直接通过文件描述符写入,不经过Python的文件缓冲区,os.write可能只写入部分内容,所以需要循环写完
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+        fd = os.open(self.path, flags, 0o644)
+        try:
+            view = memoryview(content)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
+    def read_bytes(self) -> bytes:
+        """
+        读取文件的二进制内容
+
+        Returns:
+            二进制内容
+        """
+        return self.path.read_bytes()
+
     def read_content(self):
         """
         读取文件内容
@@ -749,6 +781,51 @@ class YamlFile(File):
 
 
 # region Json文件
+@functools.lru_cache(maxsize=256)
+def _compile_jsonpath(json_path: str):
+    """
+    解析 JSON Path 表达式,同一个表达式只解析一次
+
+    Args:
+        json_path: JSON Path
+
+    Returns:
+        解析后的 JSON Path 表达式对象
+    """
+    return parse(json_path)
+
+
+class _JsonPathBatch(object):
+    """
+    在一次读取和一次写入之间批量执行多个 JSON Path 修改,由`JsonFile.batch_update`创建
+    """
+
+    def __init__(self, json_file: "JsonFile"):
+        self.json_file = json_file
+        """要修改的json文件"""
+        self.data = None
+        """读取到的json数据,修改都在这份数据上进行"""
+
+    def __enter__(self) -> "_JsonPathBatch":
+        self.data = self.json_file._read_json_without_bom()
+        return self
+
+    def set(self, json_path: str, new_value):
+        """
+        通过 JSON Path 设置值,退出上下文时才写入文件
+
+        Args:
+            json_path: JSON Path
+            new_value: 新值
+        """
+        self.data = _compile_jsonpath(json_path).update(self.data, new_value)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # 出现异常时不写入,文件保持原样
+        if exc_type is None:
+            self.json_file.write_dict(self.data)
+
+
 class JsonFile(File):
 
     def __init__(self, path: str, auto_create_parent_dir=False):
@@ -758,8 +835,7 @@ class JsonFile(File):
         """
         读取文件内容并将其转换为字典对象
         """
-        with open(self.path, "r", encoding="utf-8") as file:
-            return json.load(file)
+        return pydantic_core.from_json(self.read_bytes())
 
     def write_dict(self, dict: dict[str, any]):
         """
@@ -780,15 +856,40 @@ class JsonFile(File):
         with open(self.path, "r", encoding="utf-8") as file:
             return dataclass.from_json(file.read())
 
-    def write_pydanitc_model(self, model: TPM):
+    @staticmethod
+    def dump_pydantic_model(model: TPM, indent: Optional[int] = 4) -> bytes:
+        """
+        将 Pydantic 模型序列化为json,忽略值为None的字段
+
+        Args:
+            model: Pydantic 模型
+            indent: 缩进空格数,为None时得到不带空白的紧凑json
+
+        Returns:
+            bytes: utf-8编码的json
+        """
+        return type(model).__pydantic_serializer__.to_json(model, indent=indent, exclude_none=True)
+
+    def write_pydanitc_model(self, model: TPM, indent: Optional[int] = 4):
         """
         将 Pydantic 模型写入文件
 
         Args:
             model: Pydantic 模型
+            indent: 缩进空格数,为None时写入不带空白的紧凑json
 
         """
-        self.write_content(model.model_dump_json(indent=4, exclude_none=True))
+        # 直接写入pydantic-core序列化得到的bytes,不经过中间的dict和str
+        self.write_bytes(self.dump_pydantic_model(model, indent))
+
+    def _read_json_without_bom(self):
+        """
+        读取json文件并解析,文件带有utf-8 BOM头时先将其移除
+        """
+        json_bytes = self.read_bytes()
+        if json_bytes.startswith(b"\xef\xbb\xbf"):
+            json_bytes = json_bytes[3:]
+        return pydantic_core.from_json(json_bytes)
 
     def get_value_by_jsonpath(self, json_path):
         """
@@ -801,15 +902,10 @@ class JsonFile(File):
             匹配到的值
         """
         # 读取json为字典
-        # region 尝试移除BOM头
-        json_str = self.read_content()
-        if json_str.startswith("\ufeff"):
-            json_str = json_str[1:]
-        # endregion
-        data = json.loads(json_str)
+        data = self._read_json_without_bom()
 
         # 解析 JSON Path
-        jsonpath_expr = parse(json_path)
+        jsonpath_expr = _compile_jsonpath(json_path)
 
         # 查找匹配的位置
         matches = jsonpath_expr.find(data)
@@ -828,33 +924,28 @@ class JsonFile(File):
             json_path: JSON Path
             new_value: 新值
         """
-        # 读取json为字典
-        # region 尝试移除BOM头
-        json_str = self.read_content()
-        if json_str.startswith("\ufeff"):
-            json_str = json_str[1:]
-        # endregion
-        data = json.loads(json_str)
+        with self.batch_update() as batch:
+            batch.set(json_path, new_value)
 
-        # 解析 JSON Path
-        jsonpath_expr = parse(json_path)
+    def batch_update(self) -> _JsonPathBatch:
+        """
+        批量通过 JSON Path 设置值,文件只在进入时读取一次,退出时写入一次
 
-        # 查找匹配的位置
-        new_data = jsonpath_expr.update(data, new_value)
-        # print(len(matches))
-        # # 修改匹配到的值
-        # for match in matches:
-        #     match.value = new_value
+        Examples:
+            >>> with json_file.batch_update() as batch:
+            ...     batch.set("a.b", 1)
+            ...     batch.set("a.c", None)
 
-        # 写入文件
-        self.write_content(json.dumps(new_data, indent=4, ensure_ascii=False))
+        Returns:
+            _JsonPathBatch: 用于`with`语句的批量修改对象
+        """
+        return _JsonPathBatch(self)
 
     def read_as_addict(self):
         """
         读取文件内容并将其转换为 Addict 对象
         """
-        with open(self.path, "r", encoding="utf-8") as file:
-            return Dict(json.load(file))
+        return Dict(pydantic_core.from_json(self.read_bytes()))
 
     def read_as_pydanitc_model(
             self, model: Type[TPM], additional_data: dict[str, any] = None
@@ -871,20 +962,78 @@ class JsonFile(File):
         Raises:
             BusinessException: 读取文件内容失败时抛出异常
         """
-        with open(self.path, "r", encoding="utf-8") as file:
-            try:
+        try:
+            if additional_data:
                 dict = self.read_as_addict()
-                if additional_data:
-                    dict.update(additional_data)
+                dict.update(additional_data)
                 return model(**dict)
-            except Exception as e:
-                raise parse_exceptions(e)
+            # 没有附加数据时直接由pydantic-core解析和校验json,不经过中间的dict
+            return model.model_validate_json(self.read_bytes())
+        except Exception as e:
+            raise parse_exceptions(e)
 
 
 # endregion
 
 
 # region 目录
+def _is_junction(path: str) -> bool:
+    """
+    判断路径是否是Windows的目录联接(junction),os.path.isjunction在Python 3.12之前不存在,此时返回False
+
+    Args:
+        path: 路径
+
+    Returns:
+        bool: 是目录联接时返回True
+    """
+    isjunction = getattr(os.path, "isjunction", None)
+    return isjunction is not None and isjunction(path)
+
+
+def _remove_tree(path: Union[str, os.PathLike], max_workers: int = 8):
+    """
+    删除整个目录树
+
+    先用os.scandir收集所有文件和子目录,文件较多时把unlink分发到线程池中并行执行(系统调用期间会释放GIL),
+    最后自底向上删除空目录。目录中的符号链接和目录联接(junction)只删除链接本身,不会进入链接指向的目录
+
+    Args:
+        path: 目录路径
+        max_workers: 并行删除文件的最大线程数
+
+    Raises:
+        OSError: 目录本身是符号链接或者目录联接时抛出,与shutil.rmtree一致
+    """
+    path = os.fspath(path)
+    if os.path.islink(path) or _is_junction(path):
+        raise OSError(f"不能删除指向目录的链接: {path}")
+    files, dirs = [], []
+    pending = [path]
+    while pending:
+        current = pending.pop()
+        dirs.append(current)
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if _is_junction(entry.path):
+                    # 目录联接和空目录一样用os.rmdir删除,删除的只是联接本身
+                    dirs.append(entry.path)
+                elif entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                else:
+                    files.append(entry.path)
+    if len(files) > 64:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for _ in executor.map(os.unlink, files):
+                pass
+    else:
+        for file in files:
+            os.unlink(file)
+    # 父目录总是先于子目录被收集,倒序删除即可保证子目录先被删除
+    for directory in reversed(dirs):
+        os.rmdir(directory)
+
+
 class Directory(object):
     def __init__(self, path: str, auto_create=True):
         """
@@ -971,7 +1120,7 @@ class Directory(object):
         """
         删除目录
         """
-        shutil.rmtree(self.path)
+        _remove_tree(self.path)
 
     # endregion
 
@@ -1117,6 +1266,21 @@ class Directory(object):
 
 
 # region git仓库
+@functools.lru_cache(maxsize=None)
+def _import_pygit2():
+    """
+    导入可选依赖pygit2,安装了pygit2时在进程内操作git仓库,不需要为每个git命令启动一个git进程
+
+    Returns:
+        pygit2模块,未安装时返回None
+    """
+    try:
+        import pygit2
+    except ImportError:
+        return None
+    return pygit2
+
+
 class GitRepository(Directory):
     def __init__(self, path: str, ignores: list[str] = None):
         """
@@ -1140,6 +1304,12 @@ class GitRepository(Directory):
         if ignores:
             git_ignore_file = self.new_file(".gitignore")
             git_ignore_file.write_content("\n".join(ignores))
+        pygit2 = _import_pygit2()
+        if pygit2:
+            index = pygit2.init_repository(str(self.path)).index
+            index.add_all()
+            index.write()
+            return
         CommandLine.run_and_get("git init", cwd=str(self.path))
         CommandLine.run_and_get("git add .", cwd=str(self.path))
 
@@ -1150,6 +1320,9 @@ class GitRepository(Directory):
         :param message: 提交信息
         :param files: 仅提交指定文件
         """
+        pygit2 = _import_pygit2()
+        if pygit2 and self._commit_with_pygit2(pygit2, message, files):
+            return
         if files:
             CommandLine.run_and_get(f"git add {' '.join(files)}", cwd=str(self.path))
             CommandLine.run_and_get(f"git commit -m '{message}'", cwd=str(self.path))
@@ -1160,6 +1333,62 @@ class GitRepository(Directory):
                 )
             )
 
+    @staticmethod
+    def _signature(pygit2, repo, role: str):
+        """
+        与git命令一样,优先使用环境变量GIT_<role>_NAME和GIT_<role>_EMAIL,否则使用配置中的user.name和user.email
+
+        :param pygit2: pygit2模块
+        :param repo: pygit2仓库
+        :param role: AUTHOR或COMMITTER
+        :return: 签名,无法确定用户名或邮箱时返回None
+        """
+        identity = {}
+        for key in ("name", "email"):
+            value = os.environ.get(f"GIT_{role}_{key.upper()}")
+            if value is None:
+                try:
+                    value = repo.config[f"user.{key}"]
+                except KeyError:
+                    return None
+            identity[key] = value
+        return pygit2.Signature(identity["name"], identity["email"])
+
+    def _commit_with_pygit2(self, pygit2, message: str, files: list[str] = None) -> bool:
+        """
+        使用pygit2提交更改,行为与`git add <files> && git commit`或`git commit -a`相同
+
+        :param pygit2: pygit2模块
+        :param message: 提交信息
+        :param files: 仅提交指定文件
+        :return: 无法确定提交者时返回False,由git命令完成提交
+        """
+        repo = pygit2.Repository(str(self.path))
+        index = repo.index
+        if files:
+            index.add_all(files)
+        else:
+            # 与`git commit -a`一样,只暂存已跟踪文件的修改和删除
+            for path, flags in repo.status().items():
+                if flags & pygit2.GIT_STATUS_WT_DELETED:
+                    index.remove(path)
+                elif flags & (pygit2.GIT_STATUS_WT_MODIFIED | pygit2.GIT_STATUS_WT_TYPECHANGE):
+                    index.add(path)
+        index.write()
+        tree = index.write_tree()
+        parents = [] if repo.head_is_unborn else [repo.head.target]
+        # 没有任何更改时与git命令一样不创建提交
+        if parents and repo[parents[0]].tree_id == tree:
+            logger.info("没有需要提交的更改")
+            return True
+        author = self._signature(pygit2, repo, "AUTHOR")
+        committer = self._signature(pygit2, repo, "COMMITTER")
+        if author is None or committer is None:
+            logger.warning("无法从环境变量和git配置中确定提交者,改用git命令提交")
+            return False
+        repo.create_commit("HEAD", author, committer, message, tree, parents)
+        return True
+
     @classmethod
     def from_remote(
             cls,
@@ -1,30 +1,236 @@
+import copy
+import functools
+import json
 import math
-import shutil
-import subprocess
+import os
+import sys
 import time
 import traceback
+import types
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import field
 from pathlib import Path
-from typing import List, Union, Any, Optional, ClassVar
+from typing import List, Union, Any, Optional, ClassVar, Tuple, Type, TypeVar, Annotated, get_args, get_origin
 
-import pyautogui
-import pyperclip
+import pydantic_core
 from PIL import ImageFont
-from clicknium import clicknium as cc, ui, locator
 from loguru import logger
-from pydantic import BaseModel
-from tenacity import retry, stop_after_attempt, stop_after_delay, wait_fixed
+from pydantic import BaseModel, ConfigDict, Discriminator, Tag
+
+from pyext.commons import ProcessManager, IntRange, Size
+from pyext.io import JsonFile, Directory, GitRepository, File
+
+TM = TypeVar("TM", bound=BaseModel)
+
+# region 共享的字符串默认值
+# 多个模型中反复出现的字符串默认值,统一驻留后所有实例引用同一个字符串对象
+_NONE = sys.intern("none")
+_PHOTO = sys.intern("photo")
+_DEFAULT = sys.intern("default")
+_LOCAL = sys.intern("local")
+_CANVAS_COLOR = sys.intern("canvas_color")
+_SPEED = sys.intern("speed")
+_STICKER_ANIMATION = sys.intern("sticker_animation")
+_VOCAL_SEPARATION = sys.intern("vocal_separation")
+_TEXT = sys.intern("text")
+_VIDEO = sys.intern("video")
+_WINDOWS = sys.intern("windows")
+_LV = sys.intern("lv")
+_FONT_PATH = sys.intern("D:/Program Files/JianyingPro5.9.0/5.9.0.11632/Resources/Font/SystemFont/zh-hans.ttf")
+_DEVICE_ID = sys.intern("93c3be64246ff28979c8f97ecb5e96a9")
+_HARD_DISK_ID = sys.intern("95fde6ca35187cfd091c19dae20a7c86")
+_MAC_ADDRESS = sys.intern("1f9453637d15522c8f952a03aefa9e74,d04e333df6159c278b5e57296362720e")
+# endregion
+
+
+# region ID生成
+def _draft_uuid() -> str:
+    """
+    生成剪映草稿中使用的大写、带连字符的UUID4字符串,例如`759EE412-31DD-4118-8CC3-BE13A0E72F59`
+
+    各模型ID字段的default_factory,直接从系统随机数设置版本位后格式化,不构造uuid.UUID对象
+
+    Returns:
+        str: UUID字符串
+    """
+    b = bytearray(os.urandom(16))
+    b[6] = b[6] & 0x0F | 0x40
+    b[8] = b[8] & 0x3F | 0x80
+    h = b.hex().upper()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+# endregion
+
+
+# region 跳过校验构造模型
+def _resolve_nested_model(annotation: Any) -> tuple[Type[BaseModel], bool] | None:
+    """
+    从字段的类型注解中解析出嵌套的模型类型
+
+    Args:
+        annotation: 字段类型注解
+
+    Returns:
+        (模型类型, 是否为列表),如果不是嵌套模型或者无法确定唯一的模型类型,则返回None
+    """
+    origin = get_origin(annotation)
+    if origin is Union or origin is types.UnionType:
+        resolved = [_resolve_nested_model(arg) for arg in get_args(annotation) if arg is not type(None)]
+        resolved = [r for r in resolved if r]
+        return resolved[0] if len(resolved) == 1 else None
+    if origin is list:
+        args = get_args(annotation)
+        inner = _resolve_nested_model(args[0]) if args else None
+        if inner and not inner[1]:
+            return inner[0], True
+        return None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None
+
+
+def _is_tuple_annotation(annotation: Any) -> bool:
+    """
+    判断字段的类型注解是否为元组(包括可选的元组)
+
+    Args:
+        annotation: 字段类型注解
+
+    Returns:
+        bool: 是元组时返回True
+    """
+    origin = get_origin(annotation)
+    if origin is Union or origin is types.UnionType:
+        return any(_is_tuple_annotation(arg) for arg in get_args(annotation))
+    return origin is tuple or annotation is tuple
+
+
+@functools.lru_cache(maxsize=None)
+def _trusted_fields(model: Type[BaseModel]) -> tuple[tuple[str, Optional[Type[BaseModel]], bool, bool, Any, Any, bool], ...]:
+    """
+    生成模型的字段构造表,每个模型类只解析一次类型注解和默认值
+
+    `model_construct`每次都会逐个字段检查别名、解析默认值并检查`default_factory`的签名,
+    而草稿模型的结构是固定的,这些都可以提前算好,构造时只需要按表填值
+
+    Args:
+        model: 模型类
+
+    Returns:
+        (字段名, 嵌套的模型类型, 是否为列表, 是否为元组, 默认值, 默认值工厂, 默认值是否需要深拷贝)组成的元组,按字段定义顺序排列
+    """
+    fields = []
+    for name, field_info in model.model_fields.items():
+        nested_model, is_list = _resolve_nested_model(field_info.annotation) or (None, False)
+        is_tuple = _is_tuple_annotation(field_info.annotation)
+        default = field_info.default
+        fields.append((name, nested_model, is_list, is_tuple, default, field_info.default_factory,
+                       not _is_hashable(default)))
+    return tuple(fields)
 
-from pyext.commons import UUID, ProcessManager, IntRange, Size
-from pyext.io import JsonFile, Directory, GitRepository
-from pyext.win import wait_win
 
+def _is_hashable(value: Any) -> bool:
+    """
+    判断值是否可哈希。与校验构造时一样,只有可哈希的默认值(例如字符串、数值、冻结的模型)才能在实例之间共用,
+    列表、字典以及未冻结的模型等其他默认值都需要深拷贝
+
+    Args:
+        value: 默认值
+
+    Returns:
+        bool: 可哈希时返回True
+    """
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _precompile_trusted_fields(*models: Type[BaseModel]):
+    """
+    预先生成模型及其所有嵌套模型的字段构造表,加载草稿时直接查表
+
+    Args:
+        *models: 根模型类
+    """
+    pending = list(models)
+    seen = set()
+    while pending:
+        model = pending.pop()
+        if model in seen:
+            continue
+        seen.add(model)
+        pending.extend(nested_model for _, nested_model, _, _, _, _, _ in _trusted_fields(model) if nested_model)
+
+
+def construct_trusted(model: Type[TM], data: dict[str, Any]) -> TM:
+    """
+    按照字段构造表递归地构造模型,跳过Pydantic的校验,得到的实例与`model_construct`相同
+
+    仅适用于由本程序生成的可信数据,用户提供的数据仍然需要经过完整的校验
+
+    Args:
+        model: 模型类
+        data: 从json中解析出来的字典
 
-class TimeRange(BaseModel):
+    Returns:
+        模型实例
+    """
+    values = {}
+    fields_set = set()
+    for name, nested_model, is_list, is_tuple, default, default_factory, copy_default in _trusted_fields(model):
+        if name in data:
+            fields_set.add(name)
+            value = data[name]
+            if is_tuple and isinstance(value, list):
+                # json中只有数组,元组类型的字段需要转换,否则序列化时会产生类型不匹配的警告
+                value = tuple(value)
+            elif nested_model is not None and value is not None:
+                if is_list:
+                    value = [construct_trusted(nested_model, v) if isinstance(v, dict) else v for v in value]
+                elif isinstance(value, dict):
+                    value = construct_trusted(nested_model, value)
+        elif default_factory is not None:
+            value = default_factory()
+        elif default is pydantic_core.PydanticUndefined:
+            # 与model_construct一样,缺少的必填字段不设置
+            continue
+        elif copy_default:
+            # 不可哈希的默认值(例如列表和未冻结的模型)不能在实例之间共用,否则修改一个实例会影响所有实例
+            value = copy.deepcopy(default)
+        else:
+            value = default
+        values[name] = value
+    # 以下与model_construct创建实例的方式相同,草稿模型没有私有属性,也不保留额外字段
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", values)
+    object.__setattr__(instance, "__pydantic_fields_set__", fields_set)
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    object.__setattr__(instance, "__pydantic_private__", None)
+    return instance
+
+
+# endregion
+
+
+class DraftModel(BaseModel):
+    """
+    剪映草稿中所有模型的基类
+    """
+
+    model_config = ConfigDict(extra="ignore", validate_default=False, arbitrary_types_allowed=False)
+    """草稿中的默认值都是合法的,不需要校验;忽略剪映新版本中增加的未知字段"""
+
+
+class TimeRange(DraftModel):
     """
     表示一个时间范围
     """
 
+    model_config = ConfigDict(frozen=True)
+
     duration: Optional[int] = None
     """持续时间"""
 
@@ -32,7 +238,11 @@ class TimeRange(BaseModel):
     """开始时间"""
 
 
-class ImageMaterial(BaseModel):
+_EMPTY_TIMERANGE = TimeRange()
+"""空的时间范围,所有未指定时间范围的字段共享这个实例"""
+
+
+class ImageMaterial(DraftModel):
     """
     图片素材
     """
@@ -82,7 +292,7 @@ class ImageMaterial(BaseModel):
     """图片宽度,以像素为单位"""
 
 
-class DraftMaterial(BaseModel):
+class DraftMaterial(DraftModel):
     """
     表示草稿中的一个素材
     """
@@ -90,15 +300,17 @@ class DraftMaterial(BaseModel):
     type: Optional[int] = None
     """素材类型"""
 
-    value: Optional[List[Union[ImageMaterial]]] = None
+    value: Optional[List[ImageMaterial]] = None
     """素材列表"""
 
 
-class DraftEnterpriseInfo(BaseModel):
+class DraftEnterpriseInfo(DraftModel):
     """
     企业信息
     """
 
+    model_config = ConfigDict(frozen=True)
+
     draft_enterprise_extra: Optional[str] = None
     """企业额外信息"""
 
@@ -112,7 +324,10 @@ class DraftEnterpriseInfo(BaseModel):
     """企业材料"""
 
 
-class DraftMetaInfo(BaseModel):
+_DEFAULT_DRAFT_ENTERPRISE_INFO = DraftEnterpriseInfo()
+
+
+class DraftMetaInfo(DraftModel):
     """
     草稿元信息
     """
@@ -147,13 +362,13 @@ class DraftMetaInfo(BaseModel):
     draft_deeplink_url: Optional[str] = None
     """草稿深度链接URL"""
 
-    draft_enterprise_info: DraftEnterpriseInfo = field(default_factory=DraftEnterpriseInfo)
+    draft_enterprise_info: DraftEnterpriseInfo = _DEFAULT_DRAFT_ENTERPRISE_INFO
     """企业信息"""
 
     draft_fold_path: str = None
     """草稿文件夹路径"""
 
-    draft_id: str = UUID.random(upper=True, formats=[(8, '-'), (12, '-'), (16, '-'), (20, '-')])
+    draft_id: str = field(default_factory=_draft_uuid)
     """草稿ID"""
 
     draft_is_ai_packaging_used: bool = False
@@ -219,8 +434,23 @@ class DraftMetaInfo(BaseModel):
     tm_duration: int = 0
     """持续时间"""
 
+    @classmethod
+    def load_trusted(cls, path: str) -> 'DraftMetaInfo':
+        """
+        从本程序生成的草稿元信息文件中加载,跳过校验
+
+        Args:
+            path: draft_meta_info.json文件路径
+
+        Returns:
+            DraftMetaInfo: 草稿元信息
+        """
+        return construct_trusted(cls, pydantic_core.from_json(JsonFile(path).read_bytes()))
+
+
+class Type0Value(DraftModel):
+    model_config = ConfigDict(frozen=True)
 
-class Type0Value(BaseModel):
     creation_time: int
     """创建时间"""
 
@@ -246,7 +476,9 @@ class Type0Value(BaseModel):
     """排序类型"""
 
 
-class Type1Value(BaseModel):
+class Type1Value(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     child_id: str
     """子ID"""
 
@@ -254,7 +486,23 @@ class Type1Value(BaseModel):
     """父ID"""
 
 
-class DraftVirtualStoreItem(BaseModel):
+def _virtual_store_value_tag(value: Any) -> str:
+    """
+    区分虚拟存储中值的类型,只有`Type1Value`包含`parent_id`字段
+    """
+    if isinstance(value, dict):
+        return "1" if "parent_id" in value else "0"
+    return "1" if isinstance(value, Type1Value) else "0"
+
+
+VirtualStoreValue = Annotated[
+    Union[Annotated[Type0Value, Tag("0")], Annotated[Type1Value, Tag("1")]],
+    Discriminator(_virtual_store_value_tag)
+]
+"""虚拟存储中的值,根据字段直接确定类型,不需要依次尝试每个类型"""
+
+
+class DraftVirtualStoreItem(DraftModel):
     """
     草稿虚拟存储中的一个条目
     """
@@ -262,11 +510,11 @@ class DraftVirtualStoreItem(BaseModel):
     type: int
     """类型"""
 
-    value: List[Union[Type0Value, Type1Value]]
+    value: List[VirtualStoreValue]
     """值"""
 
 
-class DraftVirtualStore(BaseModel):
+class DraftVirtualStore(DraftModel):
     draft_materials: List[DraftMaterial] = field(default_factory=list)
     """草稿材料"""
 
@@ -276,7 +524,7 @@ class DraftVirtualStore(BaseModel):
 
 # region draft_content.json
 
-class CanvasConfig(BaseModel):
+class CanvasConfig(DraftModel):
     height: int
     """画布高度"""
 
@@ -287,33 +535,35 @@ class CanvasConfig(BaseModel):
     """画布宽度"""
 
 
-class Platform(BaseModel):
+class Platform(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     app_id: int = 3704
     """应用ID"""
 
-    app_source: str = "lv"
+    app_source: str = _LV
     """应用来源"""
 
     app_version: str = "5.9.0"
     """应用版本"""
 
-    device_id: str = "93c3be64246ff28979c8f97ecb5e96a9"
+    device_id: str = _DEVICE_ID
     """设备ID"""
 
-    hard_disk_id: str = "95fde6ca35187cfd091c19dae20a7c86"
+    hard_disk_id: str = _HARD_DISK_ID
     """硬盘ID"""
 
-    mac_address: str = "1f9453637d15522c8f952a03aefa9e74,d04e333df6159c278b5e57296362720e"
+    mac_address: str = _MAC_ADDRESS
     """MAC地址"""
 
-    os: str = "windows"
+    os: str = _WINDOWS
     """操作系统"""
 
     os_version: str = "10.0.22631"
     """操作系统版本"""
 
 
-class Keyframes(BaseModel):
+class Keyframes(DraftModel):
     adjusts: List = field(default_factory=list)
     """调整"""
 
@@ -339,7 +589,7 @@ class Keyframes(BaseModel):
     """视频"""
 
 
-class Canvas(BaseModel):
+class Canvas(DraftModel):
     album_image: str = ""
     """专辑图像"""
 
@@ -349,8 +599,7 @@ class Canvas(BaseModel):
     color: str = ""
     """颜色"""
 
-    id: str = field(
-        default_factory=lambda: UUID.random(upper=True, formats=[(8, '-'), (12, '-'), (16, '-'), (20, '-')]))
+    id: str = field(default_factory=_draft_uuid)
     """ID"""
 
     image: str = ""
@@ -368,31 +617,29 @@ class Canvas(BaseModel):
     team_id: str = ""
     """团队ID"""
 
-    type: str = "canvas_color"
+    type: str = _CANVAS_COLOR
     """类型"""
 
 
-class AudioConfig(BaseModel):
+class AudioConfig(DraftModel):
     audio_channel_mapping: int = 0
     """音频通道映射"""
 
-    id: str = field(
-        default_factory=lambda: UUID.random(upper=True, formats=[(8, '-'), (12, '-'), (16, '-'), (20, '-')]))
+    id: str = field(default_factory=_draft_uuid)
     """ID"""
 
     is_config_open: bool = False
     """配置是否开启"""
 
-    type: str = "none"
+    type: str = _NONE
     """类型"""
 
 
-class SpeedConfig(BaseModel):
+class SpeedConfig(DraftModel):
     curve_speed: Optional[float] = None
     """曲线速度"""
 
-    id: str = field(
-        default_factory=lambda: UUID.random(upper=True, formats=[(8, '-'), (12, '-'), (16, '-'), (20, '-')]))
+    id: str = field(default_factory=_draft_uuid)
     """ID"""
 
     mode: int = 0
@@ -401,11 +648,13 @@ class SpeedConfig(BaseModel):
     speed: float = 1.0
     """速度"""
 
-    type: str = "speed"
+    type: str = _SPEED
     """类型"""
 
 
-class Crop(BaseModel):
+class Crop(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     lower_left_x: float = 0.0
     """左下角X坐标"""
 
@@ -431,7 +680,12 @@ class Crop(BaseModel):
     """右上角Y坐标"""
 
 
-class Matting(BaseModel):
+_DEFAULT_CROP = Crop()
+
+
+class Matting(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     flag: int = 0
     """标志"""
 
@@ -441,35 +695,43 @@ class Matting(BaseModel):
     has_use_quick_eraser: bool = False
     """是否使用快速橡皮擦"""
 
-    interactiveTime: List[int] = ()
+    interactiveTime: Tuple[int, ...] = ()
     """交互时间"""
 
     path: str = ""
     """路径"""
 
-    strokes: List[str] = ()
+    strokes: Tuple[str, ...] = ()
     """笔触"""
 
 
-class Stable(BaseModel):
+_DEFAULT_MATTING = Matting()
+
+
+class Stable(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     matrix_path: str = ""
     """矩阵路径"""
 
     stable_level: int = 0
     """稳定等级"""
 
-    time_range: TimeRange = field(default_factory=TimeRange)
+    time_range: TimeRange = _EMPTY_TIMERANGE
     """时间范围"""
 
 
-class Algorithm(BaseModel):
+_DEFAULT_STABLE = Stable()
+
+
+class Algorithm(DraftModel):
     algorithm_id: str = ""
     """算法ID"""
     type: str = ""
     """类型"""
 
 
-class NoiseReduction(BaseModel):
+class NoiseReduction(DraftModel):
     """
     降噪
     """
@@ -477,7 +739,9 @@ class NoiseReduction(BaseModel):
     """等级"""
 
 
-class VideoAlgorithm(BaseModel):
+class VideoAlgorithm(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     algorithms: List[Algorithm] = field(default_factory=list)
     """算法"""
 
@@ -487,7 +751,7 @@ class VideoAlgorithm(BaseModel):
     deflicker: Optional[str] = None
     """去闪烁"""
 
-    gameplay_configs: List[str] = ()
+    gameplay_configs: Tuple[str, ...] = ()
     """游戏配置"""
 
     motion_blur_config: Optional[str] = None
@@ -506,8 +770,11 @@ class VideoAlgorithm(BaseModel):
     """时间范围"""
 
 
-class Photo(BaseModel):
-    aigc_type: str = "none"
+_DEFAULT_VIDEO_ALGORITHM = VideoAlgorithm()
+
+
+class Photo(DraftModel):
+    aigc_type: str = _NONE
     """AIGC类型"""
 
     audio_fade: Optional[float] = None
@@ -519,13 +786,13 @@ class Photo(BaseModel):
     category_id: str = ""
     """类别ID"""
 
-    category_name: str = "local"
+    category_name: str = _LOCAL
     """类别名称"""
 
     check_flag: int = 63487
     """检查标志"""
 
-    crop: Crop = field(default_factory=Crop)
+    crop: Crop = _DEFAULT_CROP
     """裁剪"""
 
     crop_ratio: str = "free"
@@ -552,8 +819,7 @@ class Photo(BaseModel):
     height: int = 1536
     """高度"""
 
-    id: str = field(
-        default_factory=lambda: UUID.random(upper=True, formats=[(8, '-'), (12, '-'), (16, '-'), (20, '-')]))
+    id: str = field(default_factory=_draft_uuid)
     """ID"""
 
     intensifies_audio_path: str = ""
@@ -589,7 +855,7 @@ class Photo(BaseModel):
     material_url: str = ""
     """素材URL"""
 
-    matting: Matting = field(default_factory=Matting)
+    matting: Matting = _DEFAULT_MATTING
     """抠图"""
 
     media_path: str = ""
@@ -604,7 +870,7 @@ class Photo(BaseModel):
     path: str = ""
     """路径"""
 
-    picture_from: str = "none"
+    picture_from: str = _NONE
     """图片来源"""
 
     picture_set_category_id: str = ""
@@ -631,28 +897,27 @@ class Photo(BaseModel):
     source_platform: int = 0
     """来源平台"""
 
-    stable: Stable = field(default_factory=Stable)
+    stable: Stable = _DEFAULT_STABLE
     """稳定"""
 
     team_id: str = ""
     """团队ID"""
 
-    type: str = "photo"
+    type: str = _PHOTO
     """类型"""
 
-    video_algorithm: VideoAlgorithm = field(default_factory=VideoAlgorithm)
+    video_algorithm: VideoAlgorithm = _DEFAULT_VIDEO_ALGORITHM
     """视频算法"""
 
     width: int = 1024
     """宽度"""
 
 
-class VocalSeparation(BaseModel):
+class VocalSeparation(DraftModel):
     choice: int = 0
     """选择"""
 
-    id: str = field(
-        default_factory=lambda: UUID.random(upper=True, formats=[(8, '-'), (12, '-'), (16, '-'), (20, '-')]))
+    id: str = field(default_factory=_draft_uuid)
     """ID"""
 
     production_path: str = ""
@@ -661,11 +926,13 @@ class VocalSeparation(BaseModel):
     time_range: Optional[TimeRange] = None
     """时间范围"""
 
-    type: str = "vocal_separation"
+    type: str = _VOCAL_SEPARATION
     """类型"""
 
 
-class Flip(BaseModel):
+class Flip(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     horizontal: bool = False
     """水平翻转"""
 
@@ -673,7 +940,12 @@ class Flip(BaseModel):
     """垂直翻转"""
 
 
-class Scale(BaseModel):
+_DEFAULT_FLIP = Flip()
+
+
+class Scale(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     x: float = 1.0
     """x轴缩放"""
 
@@ -681,7 +953,12 @@ class Scale(BaseModel):
     """y轴缩放"""
 
 
-class Transform(BaseModel):
+_DEFAULT_SCALE = Scale()
+
+
+class Transform(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     x: float = 0.0
     """x轴变换"""
 
@@ -689,24 +966,34 @@ class Transform(BaseModel):
     """y轴变换"""
 
 
-class Clip(BaseModel):
+_DEFAULT_TRANSFORM = Transform()
+
+
+class Clip(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     alpha: float = 1.0
     """透明度"""
 
-    flip: Flip = field(default_factory=Flip)
+    flip: Flip = _DEFAULT_FLIP
     """翻转"""
 
     rotation: float = 0.0
     """旋转"""
 
-    scale: Scale = field(default_factory=Scale)
+    scale: Scale = _DEFAULT_SCALE
     """缩放"""
 
-    transform: Transform = field(default_factory=Transform)
+    transform: Transform = _DEFAULT_TRANSFORM
     """变换"""
 
 
-class HDRSettings(BaseModel):
+_DEFAULT_CLIP = Clip()
+
+
+class HDRSettings(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     intensity: float = 1.0
     """强度"""
 
@@ -717,7 +1004,12 @@ class HDRSettings(BaseModel):
     """尼特"""
 
 
-class ResponsiveLayout(BaseModel):
+_DEFAULT_HDR_SETTINGS = HDRSettings()
+
+
+class ResponsiveLayout(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     enable: bool = False
     """启用"""
 
@@ -734,7 +1026,12 @@ class ResponsiveLayout(BaseModel):
     """垂直位置布局"""
 
 
-class UniformScale(BaseModel):
+_DEFAULT_RESPONSIVE_LAYOUT = ResponsiveLayout()
+
+
+class UniformScale(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     on: bool = True
     """启用"""
 
@@ -742,17 +1039,20 @@ class UniformScale(BaseModel):
     """值"""
 
 
-class Segment(BaseModel):
+_DEFAULT_UNIFORM_SCALE = UniformScale()
+
+
+class Segment(DraftModel):
     caption_info: Optional[str] = None
     """字幕信息"""
 
     cartoon: bool = False
     """卡通"""
 
-    clip: Clip = field(default_factory=Clip)
+    clip: Clip = _DEFAULT_CLIP
     """剪辑"""
 
-    common_keyframes: List[str] = ()
+    common_keyframes: Tuple[str, ...] = ()
     """常见关键帧"""
 
     enable_adjust: bool = True
@@ -782,11 +1082,10 @@ class Segment(BaseModel):
     group_id: str = ""
     """组ID"""
 
-    hdr_settings: Optional[HDRSettings] = field(default_factory=HDRSettings)
+    hdr_settings: Optional[HDRSettings] = _DEFAULT_HDR_SETTINGS
     """HDR设置"""
 
-    id: str = field(
-        default_factory=lambda: UUID.random(upper=True, formats=[(8, '-'), (12, '-'), (16, '-'), (20, '-')]))
+    id: str = field(default_factory=_draft_uuid)
     """ID"""
 
     intensifies_audio: bool = False
@@ -798,7 +1097,7 @@ class Segment(BaseModel):
     is_tone_modify: bool = False
     """是否音调修改"""
 
-    keyframe_refs: List[str] = ()
+    keyframe_refs: Tuple[str, ...] = ()
     """关键帧引用"""
 
     last_nonzero_volume: float = 1.0
@@ -810,25 +1109,25 @@ class Segment(BaseModel):
     render_index: int = 0
     """渲染索引"""
 
-    responsive_layout: ResponsiveLayout = field(default_factory=ResponsiveLayout)
+    responsive_layout: ResponsiveLayout = _DEFAULT_RESPONSIVE_LAYOUT
     """响应布局"""
 
     reverse: bool = False
     """反向"""
 
-    source_timerange: Optional[TimeRange] = field(default_factory=TimeRange)
+    source_timerange: Optional[TimeRange] = _EMPTY_TIMERANGE
     """源时间范围"""
 
     speed: float = 1.0
     """速度"""
 
-    target_timerange: TimeRange = field(default_factory=TimeRange)
+    target_timerange: TimeRange = _EMPTY_TIMERANGE
     """目标时间范围"""
 
     template_id: str = ""
     """模板ID"""
 
-    template_scene: str = "default"
+    template_scene: str = _DEFAULT
     """模板场景"""
 
     track_attribute: int = 0
@@ -837,7 +1136,7 @@ class Segment(BaseModel):
     track_render_index: int = 0
     """轨道渲染索引"""
 
-    uniform_scale: UniformScale = field(default_factory=UniformScale)
+    uniform_scale: UniformScale = _DEFAULT_UNIFORM_SCALE
     """统一缩放"""
 
     visible: bool = True
@@ -847,15 +1146,14 @@ class Segment(BaseModel):
     """音量"""
 
 
-class Track(BaseModel):
+class Track(DraftModel):
     attribute: int = 0
     """属性"""
 
     flag: int = 0
     """标志"""
 
-    id: str = field(
-        default_factory=lambda: UUID.random(upper=True, formats=[(8, '-'), (12, '-'), (16, '-'), (20, '-')]))
+    id: str = field(default_factory=_draft_uuid)
     """ID"""
 
     is_default_name: bool = True
@@ -867,26 +1165,27 @@ class Track(BaseModel):
     segments: List[Segment] = field(default_factory=list)
     """片段"""
 
-    type: str = "video"
+    type: str = _VIDEO
     """类型"""
 
 
-class StickerAnimation(BaseModel):
+class StickerAnimation(DraftModel):
     animations: List[str] = field(default_factory=list)
     """动画"""
 
-    id: str = field(
-        default_factory=lambda: UUID.random(upper=True, formats=[(8, '-'), (12, '-'), (16, '-'), (20, '-')]))
+    id: str = field(default_factory=_draft_uuid)
     """ID"""
 
-    multi_language_current: str = "none"
+    multi_language_current: str = _NONE
     """多语言当前状态"""
 
-    type: str = "sticker_animation"
+    type: str = _STICKER_ANIMATION
     """类型"""
 
 
-class CaptionTemplateInfo(BaseModel):
+class CaptionTemplateInfo(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     category_id: str = ""
     """分类ID"""
 
@@ -915,12 +1214,22 @@ class CaptionTemplateInfo(BaseModel):
     """来源平台"""
 
 
-class ComboInfo(BaseModel):
+_DEFAULT_CAPTION_TEMPLATE_INFO = CaptionTemplateInfo()
+
+
+class ComboInfo(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     text_templates: List[str] = field(default_factory=list)
     """文本模板"""
 
 
-class ShadowPoint(BaseModel):
+_DEFAULT_COMBO_INFO = ComboInfo()
+
+
+class ShadowPoint(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     x: float = 0.6363961030678928
     """x轴阴影点"""
 
@@ -928,60 +1237,88 @@ class ShadowPoint(BaseModel):
     """y轴阴影点"""
 
 
-class Words(BaseModel):
-    end_time: List[str] = field(default_factory=list)
+_DEFAULT_SHADOW_POINT = ShadowPoint()
+
+
+class Words(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
+    end_time: Tuple[str, ...] = ()
     """结束时间"""
 
-    start_time: List[str] = field(default_factory=list)
+    start_time: Tuple[str, ...] = ()
     """开始时间"""
 
-    text: List[str] = field(default_factory=list)
+    text: Tuple[str, ...] = ()
     """文本"""
 
 
-class Solid(BaseModel):
+_DEFAULT_WORDS = Words()
+
+
+class Solid(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     alpha: float = None
     """透明度"""
 
-    color: List[int] = (1, 1, 1)
+    color: Tuple[float, float, float] = (1.0, 1.0, 1.0)
     """颜色"""
 
 
-class Content(BaseModel):
+_DEFAULT_SOLID = Solid()
+
+
+class Content(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     render_type: str = None
     """渲染类型"""
 
-    solid: Solid = field(default_factory=Solid)
+    solid: Solid = _DEFAULT_SOLID
     """实心"""
 
 
-class Fill(BaseModel):
+_DEFAULT_CONTENT = Content()
+
+
+class Fill(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     alpha: Optional[float] = None
     """透明度"""
 
-    content: Optional[Content] = field(default_factory=Content)
+    content: Optional[Content] = _DEFAULT_CONTENT
     """内容"""
 
     width: Optional[float] = None
     """宽度"""
 
 
-class Font(BaseModel):
+_DEFAULT_FILL = Fill()
+
+
+class Font(DraftModel):
+    model_config = ConfigDict(frozen=True)
+
     id: str = ""
     """字体ID"""
 
-    path: str = "D:/Program Files/JianyingPro5.9.0/5.9.0.11632/Resources/Font/SystemFont/zh-hans.ttf"
+    path: str = _FONT_PATH
     """字体路径"""
 
 
-class Style(BaseModel):
-    fill: Fill = field(default_factory=Fill)
+_DEFAULT_FONT = Font()
+
+
+class Style(DraftModel):
+    fill: Fill = _DEFAULT_FILL
     """填充"""
 
-    font: Font = field(default_factory=Font)
+    font: Font = _DEFAULT_FONT
     """字体"""
 
-    range: List[int] = (0, 4)
+    range: Tuple[int, int] = (0, 4)
     """范围"""
 
     size: float = 15.0
@@ -994,7 +1331,7 @@ class Style(BaseModel):
     """使用字母颜色"""
 
 
-class TextContent(BaseModel):
+class TextContent(DraftModel):
     styles: List[Style] = field(default_factory=list)
     """样式"""
 
@@ -1002,7 +1339,65 @@ class TextContent(BaseModel):
     """文本"""
 
 
-class TextMaterialFont(BaseModel):
+_DEFAULT_TEXT_CONTENT_JSON = (
+    "{\"styles\":[{\"fill\":{\"alpha\":1.0,\"content\":{\"render_type\":\"solid\",\"solid\":{\"alpha\":1.0,\"color\":[1.0,1.0,1.0]}}},"
+    "\"font\":{\"id\":\"\",\"path\":\"" + _FONT_PATH + "\"},"
+    "\"range\":[0,4],\"size\":15.0}],\"text\":\"默认文本\"}"
+)
+"""文本素材默认内容的json字符串"""
+
+_DEFAULT_TEXT_CONTENT = TextContent.model_validate_json(_DEFAULT_TEXT_CONTENT_JSON)
+"""文本素材的默认内容"""
+
+
+_RANGE_END_PLACEHOLDER = 987654321
+"""生成文本内容模板时用于定位样式范围的占位值"""
+
+
+@functools.lru_cache(maxsize=None)
+def _single_style_text_content_template(size: float, font_path: str = None) -> Tuple[str, str, str]:
+    """
+    生成只有一个样式的文本内容的json模板,每种字体大小和字体只通过pydantic序列化一次
+
+    Args:
+        size: 字体大小
+        font_path: 字体路径,为空时使用默认字体
+
+    Returns:
+        Tuple[str, str, str]: 被样式范围的结束位置和文本分隔开的三段json
+    """
+    template = TextContent(
+        text="",
+        styles=[
+            Style(
+                size=size,
+                range=(0, _RANGE_END_PLACEHOLDER),
+                font=Font(path=font_path) if font_path else Font()
+            )
+        ]
+    ).model_dump_json(exclude_none=True)
+    head, tail = template.split(f'"range":[0,{_RANGE_END_PLACEHOLDER}]')
+    middle, end = tail.rsplit('"text":""', 1)
+    return head + '"range":[0,', "]" + middle + '"text":', end
+
+
+def _single_style_text_content_json(text: str, size: float, font_path: str = None) -> str:
+    """
+    序列化只有一个样式的文本内容,只有文本和样式范围需要填入模板
+
+    Args:
+        text: 文本
+        size: 字体大小
+        font_path: 字体路径,为空时使用默认字体
+
+    Returns:
+        str: TextContent的json字符串
+    """
+    head, middle, end = _single_style_text_content_template(size, font_path)
+    return f"{head}{len(text)}{middle}{json.dumps(text, ensure_ascii=False)}{end}"
+
+
+class TextMaterialFont(DraftModel):
     category_id: str
     """
     分类ID
@@ -1049,7 +1444,7 @@ class TextMaterialFont(BaseModel):
     """
 
 
-class TextMaterial(BaseModel):
+class TextMaterial(DraftModel):
     add_type: int = 0
     """添加类型"""
 
@@ -1095,16 +1490,16 @@ class TextMaterial(BaseModel):
     border_width: float = 0.08
     """边框宽度"""
 
-    caption_template_info: CaptionTemplateInfo = field(default_factory=CaptionTemplateInfo)
+    caption_template_info: CaptionTemplateInfo = _DEFAULT_CAPTION_TEMPLATE_INFO
     """字幕模板信息"""
 
     check_flag: int = 7
     """检查标志"""
 
-    combo_info: ComboInfo = field(default_factory=ComboInfo)
+    combo_info: ComboInfo = _DEFAULT_COMBO_INFO
     """组合信息"""
 
-    content: str = "{\"styles\":[{\"fill\":{\"alpha\":1.0,\"content\":{\"render_type\":\"solid\",\"solid\":{\"alpha\":1.0,\"color\":[1.0,1.0,1.0]}}},\"font\":{\"id\":\"\",\"path\":\"D:/Program Files/JianyingPro5.9.0/5.9.0.11632/Resources/Font/SystemFont/zh-hans.ttf\"},\"range\":[0,4],\"size\":15.0}],\"text\":\"默认文本\"}"
+    content: str = _DEFAULT_TEXT_CONTENT_JSON
     """内容,TextContent类的json字符串"""
 
     fixed_height: float = -1.0
@@ -1125,7 +1520,7 @@ class TextMaterial(BaseModel):
     font_name: str = ""
     """字体名称"""
 
-    font_path: str = "D:/Program Files/JianyingPro5.9.0/5.9.0.11632/Resources/Font/SystemFont/zh-hans.ttf"
+    font_path: str = _FONT_PATH
     """字体路径"""
 
     font_resource_id: str = ""
@@ -1140,7 +1535,7 @@ class TextMaterial(BaseModel):
     font_team_id: str = ""
     """字体团队ID"""
 
-    font_title: str = "none"
+    font_title: str = _NONE
     """字体标题"""
 
     font_url: str = ""
@@ -1161,8 +1556,7 @@ class TextMaterial(BaseModel):
     has_shadow: bool = False
     """有阴影"""
 
-    id: str = field(
-        default_factory=lambda: UUID.random(upper=True, formats=[(8, '-'), (12, '-'), (16, '-'), (20, '-')]))
+    id: str = field(default_factory=_draft_uuid)
     """ID"""
 
     initial_scale: float = 1.0
@@ -1198,13 +1592,13 @@ class TextMaterial(BaseModel):
     line_spacing: float = 0.02
     """行间距"""
 
-    multi_language_current: str = "none"
+    multi_language_current: str = _NONE
     """多语言当前状态"""
 
     name: str = ""
     """名称"""
 
-    original_size: List[str] = ()
+    original_size: Tuple[str, ...] = ()
     """原始尺寸"""
 
     preset_category: str = ""
@@ -1246,7 +1640,7 @@ class TextMaterial(BaseModel):
     shadow_distance: float = 5.0
     """阴影距离"""
 
-    shadow_point: ShadowPoint = field(default_factory=ShadowPoint)
+    shadow_point: ShadowPoint = _DEFAULT_SHADOW_POINT
     """阴影点"""
 
     shadow_smoothing: float = 0.45
@@ -1294,7 +1688,7 @@ class TextMaterial(BaseModel):
     tts_auto_update: bool = False
     """TTS自动更新"""
 
-    type: str = "text"
+    type: str = _TEXT
     """类型"""
 
     typesetting: int = 0
@@ -1312,11 +1706,65 @@ class TextMaterial(BaseModel):
     use_effect_default_color: bool = True
     """使用效果默认颜色"""
 
-    words: Words = field(default_factory=Words)
+    words: Words = _DEFAULT_WORDS
     """单词"""
 
+    @property
+    def text_content(self) -> TextContent:
+        """
+        解析后的文本内容,每次访问都会重新解析`content`,修改后需要通过`set_text_content`写回
+        """
+        return TextContent.model_validate_json(self.content)
+
+    def set_text_content(self, text_content: TextContent):
+        """
+        设置文本内容,与默认内容相同时直接复用默认的json字符串
+
+        Args:
+            text_content: 文本内容
+        """
+        if text_content is _DEFAULT_TEXT_CONTENT or text_content == _DEFAULT_TEXT_CONTENT:
+            self.content = _DEFAULT_TEXT_CONTENT_JSON
+        else:
+            self.content = text_content.model_dump_json(exclude_none=True)
 
-class TTSMeta(BaseModel):
+    @classmethod
+    def from_text_content(cls, text_content: TextContent, **kwargs) -> 'TextMaterial':
+        """
+        使用文本内容创建文本素材
+
+        Args:
+            text_content: 文本内容,与默认内容相同时直接复用默认的json字符串
+            **kwargs: 文本素材的其它字段
+
+        Returns:
+            TextMaterial: 文本素材
+        """
+        if text_content is _DEFAULT_TEXT_CONTENT or text_content == _DEFAULT_TEXT_CONTENT:
+            content = _DEFAULT_TEXT_CONTENT_JSON
+        else:
+            content = text_content.model_dump_json(exclude_none=True)
+        return cls(content=content, **kwargs)
+
+    @classmethod
+    def from_text(cls, text: str, font_size: float, font_path: str = None, **kwargs) -> 'TextMaterial':
+        """
+        使用只有一个样式的文本创建文本素材
+
+        Args:
+            text: 文本
+            font_size: 字体大小
+            font_path: 字体路径,为空时使用默认字体
+            **kwargs: 文本素材的其它字段
+
+        Returns:
+            TextMaterial: 文本素材
+        """
+        return cls(content=_single_style_text_content_json(text, font_size, font_path), font_size=font_size,
+                   **kwargs)
+
+
+class TTSMeta(DraftModel):
     text: str
     """
     文本内容
@@ -1339,14 +1787,14 @@ class TTSMeta(BaseModel):
     """
 
 
-class VideoMeta(BaseModel):
+class VideoMeta(DraftModel):
     path: str
     """
     视频路径
     """
 
 
-class VoiceInfo(BaseModel):
+class VoiceInfo(DraftModel):
     is_ai_clone_tone: bool
     """
     是否为AI克隆音调
@@ -1401,7 +1849,7 @@ class VoiceInfo(BaseModel):
     """
 
 
-class DigitalHuman(BaseModel):
+class DigitalHuman(DraftModel):
     background: Optional[str] = None
     """
     背景
@@ -1452,7 +1900,7 @@ class DigitalHuman(BaseModel):
     """
 
 
-class Materials(BaseModel):
+class Materials(DraftModel):
     ai_translates: List = field(default_factory=list)
     """AI翻译"""
 
@@ -1579,7 +2027,7 @@ class Materials(BaseModel):
     video_trackings: List = field(default_factory=list)
     """视频追踪"""
 
-    videos: List[Union[Photo]] = field(default_factory=list)
+    videos: List[Photo] = field(default_factory=list)
     """视频"""
 
     vocal_beautifys: List = field(default_factory=list)
@@ -1589,7 +2037,7 @@ class Materials(BaseModel):
     """人声分离"""
 
 
-class Config(BaseModel):
+class Config(DraftModel):
     adjust_max_index: int = 1
     """调整最大索引"""
 
@@ -1620,16 +2068,16 @@ class Config(BaseModel):
     material_save_mode: int = 0
     """材料保存模式"""
 
-    multi_language_current: str = "none"
+    multi_language_current: str = _NONE
     """当前多语言"""
 
     multi_language_list: List = field(default_factory=list)
     """多语言列表"""
 
-    multi_language_main: str = "none"
+    multi_language_main: str = _NONE
     """主多语言"""
 
-    multi_language_mode: str = "none"
+    multi_language_mode: str = _NONE
     """多语言模式"""
 
     original_sound_last_index: int = 1
@@ -1664,7 +2112,7 @@ class Config(BaseModel):
 
 
 # region 草稿内容
-class DraftContent(BaseModel):
+class DraftContent(DraftModel):
     canvas_config: Optional[CanvasConfig] = None
     """画布配置"""
 
@@ -1695,8 +2143,7 @@ class DraftContent(BaseModel):
     group_container: Optional[Any] = None
     """组容器"""
 
-    id: str = field(
-        default_factory=lambda: UUID.random(upper=True, formats=[(8, '-'), (12, '-'), (16, '-'), (20, '-')]))
+    id: str = field(default_factory=_draft_uuid)
     """ID"""
     # id: Optional[str] = None
 
@@ -1743,7 +2190,7 @@ class DraftContent(BaseModel):
     """时间标记"""
 
     tracks: List[Track] = field(default_factory=lambda: [Track(
-        type="video",
+        type=_VIDEO,
     )])
     """轨道"""
 
@@ -1753,20 +2200,41 @@ class DraftContent(BaseModel):
     version: Optional[int] = None
     """版本"""
 
+    @classmethod
+    def load_trusted(cls, path: str) -> 'DraftContent':
+        """
+        从本程序生成的草稿内容文件中加载,跳过校验
+
+        Args:
+            path: draft_content.json文件路径
+
+        Returns:
+            DraftContent: 草稿内容
+        """
+        # pydantic-core的json解析器比标准库的json快一倍左右
+        return construct_trusted(cls, pydantic_core.from_json(JsonFile(path).read_bytes()))
+
+
+_precompile_trusted_fields(DraftMetaInfo, DraftVirtualStore, DraftContent)
 
 # endregion
 
 
 # region 剪映草稿
+_TEXT_SEGMENT_DURATION = 3000000
+"""文本轨道中每个片段的时长(微秒)"""
+
+
 class JianYingDraft:
 
     @classmethod
-    def load_from_dir(cls, draft_dir: str) -> 'JianYingDraft':
+    def load_from_dir(cls, draft_dir: str, trusted: bool = False) -> 'JianYingDraft':
         """
         从目录加载剪映草稿
 
         Args:
             draft_dir: 草稿目录
+            trusted: 草稿是否由本程序生成,可信的草稿在加载时会跳过校验
 
         Returns:
             JianYingDraft   剪映草稿对象
@@ -1779,8 +2247,17 @@ class JianYingDraft:
             raise ValueError(f"草稿目录不存在: {draft_dir}")
         content_json_file = JsonFile(str(draft_dir.path.joinpath("draft_content.json")))
         meta_json_file = JsonFile(str(draft_dir.path.joinpath("draft_meta_info.json")))
-        return cls(draft_dir.name, meta_json_file.read_as_pydanitc_model(DraftMetaInfo),
-                   content_json_file.read_as_pydanitc_model(DraftContent), str(draft_dir.path))
+        if trusted:
+            draft = cls(draft_dir.name, DraftMetaInfo.load_trusted(str(meta_json_file.path)),
+                        DraftContent.load_trusted(str(content_json_file.path)), str(draft_dir.path.parent))
+        else:
+            draft = cls(draft_dir.name, meta_json_file.read_as_pydanitc_model(DraftMetaInfo),
+                        content_json_file.read_as_pydanitc_model(DraftContent), str(draft_dir.path.parent))
+        # 草稿目录和JSON文件都已经存在,保存和重新加载时直接复用
+        draft.meta_json_file = meta_json_file
+        draft.content_json_file = content_json_file
+        draft._draft_dir_created = True
+        return draft
 
     def __init__(self, name: str, meta: DraftMetaInfo = None, content: DraftContent = None,
                  draft_root_path: str = None):
@@ -1809,6 +2286,10 @@ class JianYingDraft:
         """草稿内容JSON文件"""
         self.git_repo = None
         """Git仓库"""
+        self._draft_dir = self.draft_root_path / name
+        """草稿目录"""
+        self._draft_dir_created = False
+        """草稿目录和JSON文件是否已经创建,创建后再次保存时不再重复检查和创建"""
 
     def set_size(self, size: Size):
         self.content.canvas_config = CanvasConfig(
@@ -1822,7 +2303,9 @@ class JianYingDraft:
         """
         删除草稿
         """
-        shutil.rmtree(str(self.draft_root_path / self.name))
+        Directory(str(self._draft_dir), auto_create=False).delete()
+        self._draft_dir_created = False
+        self.git_repo = None
 
     # endregion
 
@@ -1834,12 +2317,21 @@ class JianYingDraft:
         Args:
             git_message: 提交消息,如果指定了git_message,则会将草稿目录初始化为git仓库并提交,如果已经是git仓库,则只提交
         """
-        directory = Directory(str(self.draft_root_path / self.name))
-        self.meta_json_file: JsonFile = directory.new_file("draft_meta_info.json")
-        self.meta.draft_fold_path = str(directory.path).replace("\\", "/")
-        self.meta_json_file.write_pydanitc_model(self.meta)
-        self.content_json_file: JsonFile = directory.new_file("draft_content.json")
-        self.content_json_file.write_pydanitc_model(self.content)
+        if not self._draft_dir_created:
+            directory = Directory(str(self._draft_dir))
+            self.meta_json_file = directory.new_file("draft_meta_info.json")
+            self.content_json_file = directory.new_file("draft_content.json")
+            self._draft_dir_created = True
+        self.meta.draft_fold_path = self._draft_dir.as_posix()
+        # 先在内存中完成两个文件的序列化再写入,序列化失败时不会留下只写了一半的草稿
+        meta_json = JsonFile.dump_pydantic_model(self.meta)
+        # 草稿内容只给剪映读取,写成紧凑json,文件大小和序列化耗时都能减少一半左右
+        content_json = JsonFile.dump_pydantic_model(self.content, indent=None)
+        # 两个文件互不依赖,元信息在另一个线程中写入,写文件的系统调用期间会释放GIL
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            meta_written = executor.submit(self.meta_json_file.write_bytes, meta_json)
+            self.content_json_file.write_bytes(content_json)
+            meta_written.result()
 
         # directory.new_folders("common_attachment")
         # directory.new_folders("matting")
@@ -1861,28 +2353,35 @@ class JianYingDraft:
         # if not draft_biz_config_json_file.exists():
         #     draft_biz_config_json_file.write_content(""" """)
         if git_message:
-            self.git_repo = GitRepository(str(directory.path), ignores=[
-                # 忽略除了draft_meta_info.json和draft_content.json以外的所有文件
-                "*",
-                "!draft_meta_info.json",
-                "!draft_content.json",
-                "!attachment_pc_common.json",
-                "!draft.extra",
-                "!draft_agency_config.json",
-                "!draft_biz_config.json",
-                "draft_settings",
-                "!.gitignore"
-            ])
+            if self.git_repo is None:
+                self.git_repo = GitRepository(str(self._draft_dir), ignores=[
+                    # 忽略除了draft_meta_info.json和draft_content.json以外的所有文件
+                    "*",
+                    "!draft_meta_info.json",
+                    "!draft_content.json",
+                    "!attachment_pc_common.json",
+                    "!draft.extra",
+                    "!draft_agency_config.json",
+                    "!draft_biz_config.json",
+                    "draft_settings",
+                    "!.gitignore"
+                ])
             self.git_repo.commit(git_message)
 
     # endregion
 
     # region 从本地加载草稿
-    def reload(self):
+    def reload(self, trusted: bool = False):
         """
         重新加载草稿内容
+
+        Args:
+            trusted: 草稿内容是否可信,可信的草稿内容在加载时会跳过校验
         """
-        self.content = self.content_json_file.read_as_pydanitc_model(DraftContent)
+        if trusted:
+            self.content = DraftContent.load_trusted(str(self.content_json_file.path))
+        else:
+            self.content = self.content_json_file.read_as_pydanitc_model(DraftContent)
 
     # endregion
 
@@ -1897,7 +2396,8 @@ class JianYingDraft:
         Returns:
             List[Segment]: 片段列表
         """
-        return [segment for track in self.content.tracks for segment in track.segments if track.type == type]
+        # 先按轨道过滤,每个轨道只比较一次类型
+        return [segment for track in self.content.tracks if track.type == type for segment in track.segments]
 
     # endregion
 
@@ -1924,57 +2424,43 @@ class JianYingDraft:
         line_spacing: float = 0.02
         # 根据每个片段的最大长度获取轨道中每个片段的文本
         segment_texts = [text[i:i + max_length_per_segment] for i in range(0, len(text), max_length_per_segment)]
-        text_track = Track(
-            segments=[
-
-            ],
-            type="text"
-        )
-        for i, segment_text in enumerate(segment_texts):
+        # 一次性生成所有片段的开始时间
+        duration = _TEXT_SEGMENT_DURATION * len(segment_texts)
+        segment_starts = range(0, duration, _TEXT_SEGMENT_DURATION)
+        # 这里不使用model_construct:它在Python中逐个解析字段默认值(每次都会检查default_factory的签名),
+        # 对默认字段很多的模型比pydantic-core中的校验构造慢一个数量级
+        # 所有片段的裁剪设置都相同,Clip是不可变的,可以共用同一个实例
+        clip = Clip(scale=Scale(x=scale, y=scale))
+        materials = self.content.materials
+        segments = []
+        for segment_start, segment_text in zip(segment_starts, segment_texts):
             sticker_animation = StickerAnimation()
-            text_content = TextContent(
-                text=segment_text,
-                styles=[
-                    Style(
-                        size=font_size,
-                        range=[0, len(segment_text)]
-                    )
-                ]
-            )
             text_material = TextMaterial(
-                content=text_content.model_dump_json(
-                    exclude_none=True,
-                ),
+                content=_single_style_text_content_json(segment_text, font_size),
                 font_size=font_size,
                 line_spacing=line_spacing,
             )
-            segment = Segment(
-                clip=Clip(
-                    scale=Scale(
-                        x=scale,
-                        y=scale
-                    )
-                ),
+            segments.append(Segment(
+                clip=clip,
                 render_index=14003,
                 extra_material_refs=[sticker_animation.id],
                 material_id=text_material.id,
                 target_timerange=TimeRange(
-                    start=int(i * 3000000),
-                    duration=3000000,
+                    start=segment_start,
+                    duration=_TEXT_SEGMENT_DURATION,
                 ),
                 hdr_settings=None,
                 source_timerange=None,
                 enable_adjust=False,
                 enable_lut=False,
                 # render_index=14001,
-            )
-            self.content.materials.material_animations.append(sticker_animation)
-            self.content.materials.texts.append(text_material)
-            text_track.segments.append(segment)
+            ))
+            materials.material_animations.append(sticker_animation)
+            materials.texts.append(text_material)
+        text_track = Track(segments=segments, type=_TEXT)
         # if self.content.color_space == -1:
         #     self.content.color_space = 0
         # 计算新的视频时长
-        duration = 3000000 * len(segment_texts)
         if self.content.duration is None:
             self.content.duration = duration
         else:
@@ -1998,14 +2484,85 @@ class JianYingDraft:
         """
         return self.content.materials.digital_humans[index]
 
+    def read_digital_human_local_task_id(self, index: int) -> Optional[str]:
+        """
+        直接从草稿内容文件中读取数字人的本地任务ID,不加载整个草稿
+
+        Args:
+            index: 数字人索引
+
+        Returns:
+            本地任务ID,数字人或任务ID还不存在时返回None
+        """
+        raw = self.content_json_file.read_bytes()
+        # 任务ID还没有写入文件时不需要解析
+        if b'"local_task_id"' not in raw:
+            return None
+        digital_humans = (pydantic_core.from_json(raw).get("materials") or {}).get("digital_humans") or []
+        if index >= len(digital_humans):
+            return None
+        return digital_humans[index].get("local_task_id")
+
 
 # endregion
 
 
 # region 剪映客户端
+@functools.lru_cache(maxsize=None)
+def _wait_win_decorator(window: str):
+    """
+    创建等待剪映窗口的装饰器,clicknium和pyext.win只在第一次使用时加载
+
+    Args:
+        window: `locator.jianyingpro`下的窗口定位符名称
+    """
+    from clicknium import locator
+    from pyext.win import wait_win
+    return wait_win(getattr(locator.jianyingpro, window))
+
+
+@functools.lru_cache(maxsize=None)
+def _import_mss():
+    """
+    导入可选依赖mss,安装了mss时直接通过系统接口截屏,比pyautogui(PIL ImageGrab)截屏更快,重复截屏时也不会泄漏内存
+
+    Returns:
+        mss模块,未安装时返回None
+    """
+    try:
+        import mss
+    except ImportError:
+        return None
+    return mss
+
+
+def _wait_win(window: str):
+    """
+    等待`locator.jianyingpro`下的窗口出现并处于活动状态,与`pyext.win.wait_win`相同,但是定位符在调用时才解析,
+    这样只使用草稿模型的程序不需要加载GUI自动化相关的模块
+
+    Args:
+        window: `locator.jianyingpro`下的窗口定位符名称
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return _wait_win_decorator(window)(func)(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
 class JianYingDesktop:
     __process_names: ClassVar[list[str]] = ["jianyingpro.exe", "parfait_crash_handler.exe"]
     """由剪映桌面版启动的所有进程名"""
+    _DIGITAL_HUMAN_PANEL_REGION: ClassVar[Tuple[float, float, float, float]] = (0.5, 0.0, 0.5, 1.0)
+    """"添加数字人"tab标签和按钮所在的剪辑窗口右侧面板,表示为相对屏幕的(左, 上, 宽, 高)比例"""
+    _IMAGE_TEMPLATE_NAMES: ClassVar[Tuple[str, ...]] = (
+        "1.png", "generate.png", "change_sound_tab2.png", "Start reading.png", "use_local_material.png")
+    """自动化操作中用到的`pyautogui/jianyingpro_img`下的图片,创建客户端时预先加载"""
 
     def __init__(self, executable_path: str, draft_root_path: str, locator_root_path: str,
                  render_digital_human_timeout: int = 60):
@@ -2033,9 +2590,151 @@ class JianYingDesktop:
         """客户端当前打开的草稿"""
         self.pids: list[int] = []
         """剪映桌面版进程ID"""
+        self._image_templates: dict[str, Any] = {}
+        """已经解码的图片模板,键为`pyautogui/jianyingpro_img`下的文件名"""
+        self._gray_image_templates: dict[str, Any] = {}
+        """已经转换为灰度的图片模板,键为`pyautogui/jianyingpro_img`下的文件名"""
+        self._screen_grabber = None
+        """安装了mss时复用的截屏对象"""
+        # 预先解码所有图片模板,操作界面时不再读取磁盘;缺少的图片在使用时才报错
+        image_dir = self.locator_root_path / "pyautogui" / "jianyingpro_img"
+        for image_name in self._IMAGE_TEMPLATE_NAMES:
+            if (image_dir / image_name).is_file():
+                self._image_template(image_name)
+
+    # region 在屏幕上查找图片
+    def _image_template(self, image_name: str, grayscale: bool = False):
+        """
+        获取`pyautogui/jianyingpro_img`下的图片模板,每张图片只从磁盘读取和解码一次
+
+        Args:
+            image_name: 图片文件名
+            grayscale: 是否获取灰度模板
+
+        Returns:
+            BGR格式或者灰度的图片数组
+        """
+        if grayscale:
+            template = self._gray_image_templates.get(image_name)
+            if template is None:
+                import cv2
+                template = cv2.cvtColor(self._image_template(image_name), cv2.COLOR_BGR2GRAY)
+                self._gray_image_templates[image_name] = template
+            return template
+        template = self._image_templates.get(image_name)
+        if template is None:
+            import cv2
+            import numpy as np
+            image_path = self.locator_root_path / "pyautogui" / "jianyingpro_img" / image_name
+            # cv2.imread不支持Windows上的非ASCII路径,先读取字节再解码
+            template = cv2.imdecode(np.fromfile(str(image_path), dtype=np.uint8), cv2.IMREAD_COLOR)
+            if template is None:
+                raise Exception(f"无法读取图片{image_path}")
+            self._image_templates[image_name] = template
+        return template
+
+    def _locate_on_screen(self, image_name: str, confidence: float = 0.8,
+                          region: Tuple[float, float, float, float] = None,
+                          grayscale: bool = False) -> Tuple[int, int]:
+        """
+        在屏幕上查找图片,与`pyautogui.locateOnScreen`的匹配方式相同,但是图片模板会被缓存
+
+        Args:
+            image_name: `pyautogui/jianyingpro_img`下的图片文件名
+            confidence: 最低匹配度
+            region: 优先查找的屏幕区域,表示为相对屏幕的(左, 上, 宽, 高)比例,区域内未找到时再查找整个屏幕
+            grayscale: 是否以灰度匹配,只比较一个通道,比彩色匹配快,适合颜色不重要的图标和文字
+
+        Returns:
+            Tuple[int, int]: 图片在屏幕上的中心点坐标
+
+        Raises:
+            Exception: 屏幕上未找到图片
+        """
+        import pyautogui
+
+        template = self._image_template(image_name, grayscale)
+        if region is not None:
+            screen_width, screen_height = pyautogui.size()
+            left, top, width, height = region
+            box = (int(screen_width * left), int(screen_height * top),
+                   int(screen_width * width), int(screen_height * height))
+            center_point = self._match_on_screen(template, confidence, box)
+            if center_point is not None:
+                return center_point
+            logger.debug(f"在区域{box}内未找到图片{image_name},改为查找整个屏幕")
+        center_point = self._match_on_screen(template, confidence)
+        if center_point is None:
+            raise Exception(f"屏幕上未找到图片{image_name}")
+        return center_point
+
+    def _grab_screen(self, box: Tuple[int, int, int, int] = None, grayscale: bool = False):
+        """
+        截取主屏幕或者主屏幕的一部分,安装了mss时使用mss截屏,否则使用pyautogui截屏
+
+        Args:
+            box: 截取的屏幕区域(左, 上, 宽, 高),为空时截取整个主屏幕
+            grayscale: 是否转换为灰度
+
+        Returns:
+            BGR格式或者灰度的截图数组
+        """
+        import cv2
+        import numpy as np
+
+        mss = _import_mss()
+        if mss is None:
+            import pyautogui
+            return cv2.cvtColor(np.asarray(pyautogui.screenshot(region=box)),
+                                cv2.COLOR_RGB2GRAY if grayscale else cv2.COLOR_RGB2BGR)
+        if self._screen_grabber is None:
+            self._screen_grabber = mss.mss()
+        if box is None:
+            monitor = self._screen_grabber.monitors[1]
+        else:
+            left, top, width, height = box
+            monitor = {"left": left, "top": top, "width": width, "height": height}
+        # mss截图是BGRA格式,转换时只需要丢弃alpha通道
+        return cv2.cvtColor(np.asarray(self._screen_grabber.grab(monitor)),
+                            cv2.COLOR_BGRA2GRAY if grayscale else cv2.COLOR_BGRA2BGR)
+
+    def _match_on_screen(self, template, confidence: float,
+                         box: Tuple[int, int, int, int] = None) -> Optional[Tuple[int, int]]:
+        """
+        截取屏幕或者屏幕的一部分,并在截图中匹配图片模板
+
+        Args:
+            template: BGR格式或者灰度的图片模板,灰度模板会在灰度截图中匹配
+            confidence: 最低匹配度
+            box: 截取的屏幕区域(左, 上, 宽, 高),为空时截取整个屏幕
+
+        Returns:
+            Optional[Tuple[int, int]]: 图片在屏幕上的中心点坐标,未找到时返回None
+        """
+        import cv2
+
+        height, width = template.shape[:2]
+        if box is not None and (box[2] < width or box[3] < height):
+            return None
+        screen = self._grab_screen(box, grayscale=template.ndim == 2)
+        result = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
+        _, max_value, _, (left, top) = cv2.minMaxLoc(result)
+        if max_value < confidence:
+            return None
+        if box is not None:
+            left += box[0]
+            top += box[1]
+        return left + width // 2, top + height // 2
+
+    # endregion
 
     # region 图文成片
     def create_image_text_video(self, text):
+        import pyautogui
+        import pyperclip
+        from clicknium import clicknium as cc, ui, locator
+        from tenacity import retry, stop_after_delay, wait_exponential
+
         window = cc.find_element(locator=locator.jianyingpro.剪映主窗口)
         window.set_focus()
         ui(locator.jianyingpro.图文成片).click()
@@ -2048,18 +2747,14 @@ class JianYingDesktop:
         pyautogui.moveRel(100, 0)
         pyautogui.click()
 
-        @retry(stop=stop_after_delay(5), wait=wait_fixed(1), reraise=True)
+        @retry(stop=stop_after_delay(5), wait=wait_exponential(multiplier=0.2, min=0.1, max=2), reraise=True)
         def wait_options_window():
             if not cc.is_existing(locator.jianyingpro.图文成片_点击生成视频按钮后出现的窗口):
                 raise Exception("图文成片_点击生成视频按钮后出现的窗口未打开")
             return True
 
         if wait_options_window():
-            image_location = pyautogui.locateOnScreen(
-                rf'{str(self.locator_root_path)}/pyautogui/jianyingpro_img/use_local_material.png',
-                confidence=0.8)
-            image_center_point = pyautogui.center(image_location)
-            center_point_x, center_point_y = image_center_point
+            center_point_x, center_point_y = self._locate_on_screen("use_local_material.png")
             pyautogui.click(center_point_x, center_point_y)
 
     # endregion
@@ -2069,6 +2764,7 @@ class JianYingDesktop:
         """
         退出剪映桌面版
         """
+        from tenacity import retry, stop_after_delay
 
         @retry(stop=stop_after_delay(999999), reraise=True)
         def body():
@@ -2082,11 +2778,14 @@ class JianYingDesktop:
     # endregion
 
     # region 剪辑窗口全屏
-    @wait_win(locator.jianyingpro.剪辑窗口)
+    @_wait_win("剪辑窗口")
     def clip_window_full_screen(self):
         """
         剪映窗口全屏
         """
+        import pyautogui
+        from clicknium import ui, locator
+
         taskbar_size = ui(locator.explorer.任务栏).get_size()
         clip_window = ui(locator.jianyingpro.剪辑窗口)
         window_size = clip_window.get_size()
@@ -2106,14 +2805,18 @@ class JianYingDesktop:
         Returns:
             bool: 如果成功启动剪映桌面版, 则返回True
         """
+        import subprocess
+        from clicknium import clicknium as cc, ui, locator
+        from tenacity import retry, stop_after_delay, wait_exponential
+
         # 已经启动则返回
         if ProcessManager.is_process_running("JianyingPro.exe"):
             started = True
         else:
-            # 否则启动剪映桌面版,然后在15秒内每隔2秒检查是否启动成功
+            # 否则启动剪映桌面版,然后轮询检查是否启动成功,检查间隔从0.2秒开始逐渐增加到2秒
             subprocess.Popen(self.executable_path)
 
-            @retry(stop=stop_after_delay(30), wait=wait_fixed(1), reraise=True)
+            @retry(stop=stop_after_delay(30), wait=wait_exponential(multiplier=0.2, min=0.1, max=2), reraise=True)
             def wait_env_check_btn():
                 logger.info("正在等待环境检测窗口上的确定按钮...")
                 if cc.is_existing(locator.jianyingpro.剪映主窗口):
@@ -2123,7 +2826,7 @@ class JianYingDesktop:
                     raise Exception("剪映主窗口未打开")
                 return True
 
-            @retry(stop=stop_after_delay(60), wait=wait_fixed(1), reraise=True)
+            @retry(stop=stop_after_delay(60), wait=wait_exponential(multiplier=0.2, min=0.1, max=2), reraise=True)
             def wait_jianying_main_window():
                 logger.info("正在等待剪映主窗口打开...")
                 if not cc.is_existing(locator.jianyingpro.剪映主窗口):
@@ -2151,9 +2854,12 @@ class JianYingDesktop:
 
         :return: 如果成功打开剪辑窗口, 则返回True, 否则返回False
         """
+        from clicknium import clicknium as cc, ui, locator
+        from tenacity import retry, stop_after_delay, wait_exponential
+
         ui(locator.jianyingpro.开始创作).click()
 
-        @retry(stop=stop_after_attempt(5), wait=wait_fixed(2), reraise=True)
+        @retry(stop=stop_after_delay(10), wait=wait_exponential(multiplier=0.2, min=0.1, max=2), reraise=True)
         def wait_main_window():
             if not cc.is_existing(locator.jianyingpro.剪辑窗口):
                 raise Exception("剪辑窗口未打开")
@@ -2164,7 +2870,7 @@ class JianYingDesktop:
     # endregion
 
     # region 打开草稿
-    @wait_win(locator.jianyingpro.剪映主窗口)
+    @_wait_win("剪映主窗口")
     def open_draft(self, draft: JianYingDraft):
         """
         打开草稿
@@ -2178,8 +2884,10 @@ class JianYingDesktop:
         Returns:
             bool: 如果成功打开草稿, 则返回True
         """
+        from clicknium import clicknium as cc, ui, locator
+        from tenacity import retry, stop_after_delay, wait_exponential
 
-        @retry(stop=stop_after_attempt(5), wait=wait_fixed(1), reraise=True)
+        @retry(stop=stop_after_delay(5), wait=wait_exponential(multiplier=0.2, min=0.1, max=2), reraise=True)
         def wait_draft_search_result():
             if not cc.is_existing(locator.jianyingpro.草稿列表中的第一个元素):
                 raise Exception(f"未找到草稿: {draft.name}")
@@ -2195,7 +2903,7 @@ class JianYingDesktop:
             ui(locator.jianyingpro.草稿列表中的第一个元素).click()
 
         # 最后等待剪辑窗口出现
-        @retry(stop=stop_after_attempt(5), wait=wait_fixed(1), reraise=True)
+        @retry(stop=stop_after_delay(5), wait=wait_exponential(multiplier=0.2, min=0.1, max=2), reraise=True)
         def wait_edit_window():
             if not cc.is_existing(locator.jianyingpro.剪辑窗口):
                 raise Exception("剪辑窗口未打开")
@@ -2215,24 +2923,34 @@ class JianYingDesktop:
         Args:
             index_range: 文本片段索引范围
         """
+        import pyautogui
+        from clicknium import ui, locator
+
+        text_segment_locator = locator.jianyingpro.文本片段
         # 先按下ctrl键
         # pyautogui.keyDown("ctrl")
-        for index in index_range:
-            params = {"index": index}
-            # logger.info(f"选择文本片段: {index}")
-            # self.cnstore_file.set_value_by_jsonpath(
-            #     "locators[6].content.childControls[0].childControls[0].childControls[0].identifier.index.value",
-            #     str(index))
-            # self.cnstore_file.set_value_by_jsonpath(
-            #     "locators[6].content.childControls[0].childControls[0].childControls[0].identifier.index.excluded",
-            #     None)
-            text_segment = ui(locator.jianyingpro.文本片段, params)
-            if index == index_range.start:  # 如果是第一个文本片段，需要先hover一下，然后按下ctrl键
-                text_segment.hover()
-                pyautogui.keyDown("ctrl")
-            text_segment.click()
-        # 释放ctrl键
-        pyautogui.keyUp("ctrl")
+        ctrl_pressed = False
+        try:
+            for index in index_range:
+                params = {"index": index}
+                # logger.info(f"选择文本片段: {index}")
+                # self.cnstore_file.set_value_by_jsonpath(
+                #     "locators[6].content.childControls[0].childControls[0].childControls[0].identifier.index.value",
+                #     str(index))
+                # self.cnstore_file.set_value_by_jsonpath(
+                #     "locators[6].content.childControls[0].childControls[0].childControls[0].identifier.index.excluded",
+                #     None)
+                text_segment = ui(text_segment_locator, params)
+                if index == index_range.start:  # 如果是第一个文本片段，需要先hover一下，然后按下ctrl键
+                    text_segment.hover()
+                    # 按键之后不需要pyautogui默认的停顿(pyautogui.PAUSE)
+                    pyautogui.keyDown("ctrl", _pause=False)
+                    ctrl_pressed = True
+                text_segment.click()
+        finally:
+            # 释放ctrl键,选择过程中出现异常也要释放,否则ctrl键会一直处于按下状态
+            if ctrl_pressed:
+                pyautogui.keyUp("ctrl", _pause=False)
         # time.sleep(3)
         # ui(locator.jianyingpro.文本轨道1)
 
@@ -2249,37 +2967,35 @@ class JianYingDesktop:
         Returns:
             bool: 如果成功更改音色, 则返回True
         """
+        import pyautogui
+        from clicknium import clicknium as cc, ui, locator
+        from tenacity import retry, stop_after_delay, wait_exponential
+
+        video_track_locator = locator.jianyingpro.视频轨道
+        sound_locator = locator.jianyingpro.音色
         # 视频轨道必须处于选中状态才能更改音色
-        if not cc.is_existing(locator.jianyingpro.视频轨道):
+        if not cc.is_existing(video_track_locator):
             raise Exception("无法更换音色, 因为未找到视频轨道")
-        ui(locator.jianyingpro.视频轨道).click()
+        ui(video_track_locator).click()
         time.sleep(1)
-        image_location = pyautogui.locateOnScreen(
-            rf'{str(self.locator_root_path)}/pyautogui/jianyingpro_img/change_sound_tab2.png',
-            confidence=0.8)
         # 移动鼠标到"添加数字人"tab标签的中心位置
-        image_center_point = pyautogui.center(image_location)
-        center_point_x, center_point_y = image_center_point
+        center_point_x, center_point_y = self._locate_on_screen("change_sound_tab2.png")
         logger.info(f"找到更换音色的tab标签,位于{center_point_x},{center_point_y}")
         pyautogui.click(center_point_x, center_point_y)
 
-        @retry(stop=stop_after_attempt(5), wait=wait_fixed(1), reraise=True)
+        @retry(stop=stop_after_delay(5), wait=wait_exponential(multiplier=0.2, min=0.1, max=2), reraise=True)
         def wait_sound_list():
-            if not cc.is_existing(locator.jianyingpro.音色):
+            if not cc.is_existing(sound_locator):
                 raise Exception(f"加载音色列表失败")
             return True
 
         if wait_sound_list():
-            ui(locator.jianyingpro.音色, {
+            ui(sound_locator, {
                 "index": sound_index
             }).click()
             time.sleep(1)
-            image_location = pyautogui.locateOnScreen(
-                rf'{str(self.locator_root_path)}/pyautogui/jianyingpro_img/Start reading.png',
-                confidence=0.8)
             # 移动鼠标到"开始朗读"按钮的中心位置
-            image_center_point = pyautogui.center(image_location)
-            center_point_x, center_point_y = image_center_point
+            center_point_x, center_point_y = self._locate_on_screen("Start reading.png")
             pyautogui.click(center_point_x, center_point_y)
 
             # 点击开始朗读按钮后,等待"音频更新中"的提示框出现
@@ -2295,7 +3011,7 @@ class JianYingDesktop:
     # endregion
 
     # region 添加数字人
-    @wait_win(locator.jianyingpro.剪辑窗口)
+    @_wait_win("剪辑窗口")
     def add_digital_human(self, text_segment_index_range: IntRange, digital_human_index: int, sound_index: int):
         """
         添加数字人
@@ -2309,19 +3025,22 @@ class JianYingDesktop:
         Returns:
             如果数字人生成成功, 则返回数字人视频文件
         """
+        import pyautogui
+        from clicknium import clicknium as cc, ui, locator
+        from tenacity import retry, stop_after_attempt, stop_after_delay, wait_exponential, wait_fixed
+
+        digital_human_locator = locator.jianyingpro.数字人
+        update_window_locator = locator.jianyingpro.数字人音频更新中窗口
+        video_track_locator = locator.jianyingpro.视频轨道
         self.select_text_segment(text_segment_index_range)
 
-        @retry(stop=stop_after_attempt(5), wait=wait_fixed(1), reraise=True)
+        @retry(stop=stop_after_delay(5), wait=wait_exponential(multiplier=0.2, min=0.1, max=2), reraise=True)
         def wait_digital_human_tab():
             """在5秒内等待文本轨道选择后出现"添加数字人"tab标签"""
-            return pyautogui.locateOnScreen(
-                rf'{str(self.locator_root_path)}/pyautogui/jianyingpro_img/1.png',
-                confidence=0.8)
+            return self._locate_on_screen("1.png", region=self._DIGITAL_HUMAN_PANEL_REGION, grayscale=True)
 
-        image_location = wait_digital_human_tab()
         # 移动鼠标到"添加数字人"tab标签的中心位置
-        image_center_point = pyautogui.center(image_location)
-        center_point_x, center_point_y = image_center_point
+        center_point_x, center_point_y = wait_digital_human_tab()
         pyautogui.click(center_point_x, center_point_y)
         time.sleep(1)
         pyautogui.click(center_point_x, center_point_y)
@@ -2333,35 +3052,32 @@ class JianYingDesktop:
         pyautogui.click(center_point_x, center_point_y)
         time.sleep(1)
 
-        @retry(stop=stop_after_attempt(5), wait=wait_fixed(1), reraise=True)
+        @retry(stop=stop_after_delay(5), wait=wait_exponential(multiplier=0.2, min=0.1, max=2), reraise=True)
         def wait_digital_human_list():
-            if not cc.is_existing(locator.jianyingpro.数字人):
+            if not cc.is_existing(digital_human_locator):
                 raise Exception(f"加载数字人列表失败")
             return True
 
         if wait_digital_human_list():
-            ui(locator.jianyingpro.数字人, {
+            ui(digital_human_locator, {
                 "index": digital_human_index
             }).click()
 
-            @retry(stop=stop_after_attempt(3), wait=wait_fixed(1), reraise=True)
+            @retry(stop=stop_after_delay(3), wait=wait_exponential(multiplier=0.2, min=0.1, max=2), reraise=True)
             def wait_add_digital_human_button():
                 """在3秒内等待数字人列表加载完成后出现"添加数字人"按钮"""
-                return pyautogui.locateOnScreen(
-                    rf'{str(self.locator_root_path)}/pyautogui/jianyingpro_img/generate.png',
-                    confidence=0.8)
+                return self._locate_on_screen("generate.png", region=self._DIGITAL_HUMAN_PANEL_REGION,
+                                             grayscale=True)
 
-            image_location = wait_add_digital_human_button()
             # 移动鼠标到"添加数字人"按钮的中心位置
-            image_center_point = pyautogui.center(image_location)
-            center_point_x, center_point_y = image_center_point
+            center_point_x, center_point_y = wait_add_digital_human_button()
 
             # 点击添加数字人按钮,然后等待"音频更新中"的提示框出现
             @retry(stop=stop_after_attempt(50), wait=wait_fixed(0.2), reraise=True)
             def wait_update_window():
                 pyautogui.click(center_point_x, center_point_y)
                 print(f"在{center_point_x},{center_point_y}上点击了添加数字人按钮")
-                if not cc.is_existing(locator.jianyingpro.数字人音频更新中窗口):
+                if not cc.is_existing(update_window_locator):
                     raise Exception(f"窗口未出现")
                 return True
 
@@ -2369,10 +3085,10 @@ class JianYingDesktop:
 
             # 点击完"添加数字人"按钮后,等待视频轨道出现
 
-            @retry(stop=stop_after_delay(30), wait=wait_fixed(1), reraise=True)
+            @retry(stop=stop_after_delay(30), wait=wait_exponential(multiplier=0.2, min=0.1, max=2), reraise=True)
             def wait_video_track():
                 # 在30秒内等待视频轨道出现
-                if not cc.is_existing(locator.jianyingpro.视频轨道):
+                if not cc.is_existing(video_track_locator):
                     raise Exception(f"视频轨道未出现")
                 return True
 
@@ -2386,25 +3102,38 @@ class JianYingDesktop:
             # 可能会有多个文件,按创建时间和大小排序，然后取第一个
             # self.dr
 
+            deadline = time.monotonic() + self.render_digital_human_timeout
+
             @retry(stop=stop_after_delay(self.render_digital_human_timeout), wait=wait_fixed(3), reraise=True)
-            def wait_video_file():
+            def wait_local_task_id():
+                # 拿到任务ID后视频文件名就确定了,等待期间只读取任务ID,不加载整个草稿
                 try:
-                    logger.info("正在等待视频渲染...")
-                    self.draft.reload()
-                    digital_human_local_task_id = self.draft.get_digit_human(0).local_task_id
-                    digital_human_video_dir = Directory(
-                        str(self.draft_root_path / f"{self.draft.name}/Resources/digitalHuman"))
-                    digital_human_video_file = digital_human_video_dir.find_file(f"{digital_human_local_task_id}.mp4")
-                    if digital_human_video_file is None:
-                        logger.info(
-                            f"{digital_human_video_dir.path}目录下未找到{digital_human_local_task_id}.mp4文件")
-                        raise Exception(f"数字人视频文件未生成")
-                    return digital_human_video_file
+                    logger.info("正在等待数字人任务...")
+                    local_task_id = self.draft.read_digital_human_local_task_id(0)
+                    if not local_task_id:
+                        raise Exception(f"数字人任务ID未生成")
+                    return local_task_id
                 except Exception as e:
                     logger.error(str(e))
                     traceback.print_exc()
                     raise e
 
+            digital_human_local_task_id = wait_local_task_id()
+            # 同步剪映写入的数字人素材,草稿只需要完整加载这一次
+            # 草稿文件此时已经被剪映改写过,不是本程序生成的可信数据,需要完整校验
+            self.draft.reload()
+            digital_human_video_path = (self.draft_root_path / self.draft.name / "Resources" / "digitalHuman" /
+                                        f"{digital_human_local_task_id}.mp4")
+
+            # 之后只检查文件是否存在,只需要一次stat,可以更频繁地检查
+            @retry(stop=stop_after_delay(max(deadline - time.monotonic(), 0)), wait=wait_fixed(1), reraise=True)
+            def wait_video_file():
+                logger.info("正在等待视频渲染...")
+                if not digital_human_video_path.is_file():
+                    logger.info(f"未找到{digital_human_video_path}文件")
+                    raise Exception("数字人视频文件未生成")
+                return File(str(digital_human_video_path))
+
             return wait_video_file()
     # endregion
 
@@ -1,32 +1,134 @@
 # 密钥服务器
+import atexit
 import base64
+import contextlib
+import queue
 import sqlite3
+import threading
 
 import typer
 from Cryptodome.Random import get_random_bytes
 from flask import Flask, request, jsonify
 
+_DB_PATH = 'keys.db'
+_POOL_SIZE = 4
+""" 连接池中最多打开的数据库连接数 """
+_pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+""" 空闲的数据库连接,Flask的多线程服务器为每个请求创建新线程,连接放在池中供之后的请求复用 """
+_pool_lock = threading.Lock()
+""" 保护已打开连接数的锁 """
+_opened = 0
+""" 已经打开的连接数 """
+_write_lock = threading.Lock()
+""" 写入锁,写事务依次执行,读取不需要加锁,在WAL模式下可以与写入并发进行 """
+
+
+def _open_connection() -> sqlite3.Connection:
+    """
+    打开一个新的数据库连接
+
+    连接使用自动提交模式,数据库使用WAL日志并降低同步级别,减少每次写入时的fsync
+
+    Returns:
+        sqlite3.Connection: 数据库连接
+    """
+    conn = sqlite3.connect(_DB_PATH, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+@contextlib.contextmanager
+def _connection(write: bool = False):
+    """
+    从连接池中取出一个数据库连接,用完后放回连接池。池中没有空闲连接且未达到上限时打开新连接,否则等待其他线程归还
+
+    Args:
+        write: 是否用于写入,写入时持有写入锁
+
+    Yields:
+        sqlite3.Connection: 数据库连接
+    """
+    global _opened
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        with _pool_lock:
+            can_open = _opened < _POOL_SIZE
+            if can_open:
+                _opened += 1
+        if can_open:
+            try:
+                conn = _open_connection()
+            except BaseException:
+                with _pool_lock:
+                    _opened -= 1
+                raise
+        else:
+            conn = _pool.get()
+    try:
+        if write:
+            with _write_lock:
+                yield conn
+        else:
+            yield conn
+    finally:
+        _pool.put(conn)
+
+
+@atexit.register
+def _close_connections():
+    """
+    关闭连接池中所有空闲的数据库连接
+    """
+    global _opened
+    while True:
+        try:
+            conn = _pool.get_nowait()
+        except queue.Empty:
+            break
+        conn.close()
+        with _pool_lock:
+            _opened -= 1
+
 
 def generate_key(client_id):
     key = base64.b64encode(get_random_bytes(32)).decode('utf-8')
 
-    conn = sqlite3.connect('keys.db')
-    c = conn.cursor()
-    c.execute("INSERT OR REPLACE INTO keys (client_id, key) VALUES (?, ?)", (client_id, key))
-    conn.commit()
-    conn.close()
+    with _connection(write=True) as conn:
+        conn.execute("INSERT OR REPLACE INTO keys (client_id, key) VALUES (?, ?)", (client_id, key))
 
     return key
 
 
-def list_client_keys():
-    conn = sqlite3.connect('keys.db')
-    c = conn.cursor()
-    c.execute("SELECT * FROM keys")
-    result = c.fetchall()
-    conn.close()
+def generate_keys(client_ids: list[str]) -> dict[str, str]:
+    """
+    批量生成客户端密钥,所有密钥在同一个事务中写入,只需要提交一次
+
+    Args:
+        client_ids: 客户端ID列表
+
+    Returns:
+        dict[str, str]: 客户端ID到密钥的映射
+    """
+    keys = [(client_id, base64.b64encode(get_random_bytes(32)).decode('utf-8')) for client_id in client_ids]
+
+    with _connection(write=True) as conn:
+        conn.execute("BEGIN")
+        try:
+            conn.executemany("INSERT OR REPLACE INTO keys (client_id, key) VALUES (?, ?)", keys)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    return dict(keys)
+
 
-    return result
+def list_client_keys():
+    with _connection() as conn:
+        return conn.execute("SELECT * FROM keys").fetchall()
 
 
 class KeyServer:
@@ -38,11 +140,8 @@ class KeyServer:
         def get_key():
             client_id = request.json['client_id']
 
-            conn = sqlite3.connect('keys.db')
-            c = conn.cursor()
-            c.execute("SELECT key FROM keys WHERE client_id = ?", (client_id,))
-            result = c.fetchone()
-            conn.close()
+            with _connection() as conn:
+                result = conn.execute("SELECT key FROM keys WHERE client_id = ?", (client_id,)).fetchone()
 
             if result:
                 return jsonify({"key": result[0]})
@@ -50,15 +149,15 @@ class KeyServer:
                 return jsonify({"error": "Key not found"}), 404
 
     def run(self, host):
-        self.app.run(host)
+        try:
+            self.app.run(host)
+        finally:
+            _close_connections()
 
     # 初始化数据库
     def init_db(self):
-        conn = sqlite3.connect('keys.db')
-        c = conn.cursor()
-        c.execute('''CREATE TABLE IF NOT EXISTS keys (client_id TEXT PRIMARY KEY, key TEXT) ''')
-        conn.commit()
-        conn.close()
+        with _connection(write=True) as conn:
+            conn.execute('''CREATE TABLE IF NOT EXISTS keys (client_id TEXT PRIMARY KEY, key TEXT) ''')
 
 
 server_app = KeyServer()
@@ -71,6 +170,18 @@ def generate(client_id: str):
     print(f"Generated key: {key}")
 
 
+@typer_app.command()
+def generate_bulk(client_ids: list[str]):
+    """
+    批量生成客户端密钥
+
+    Args:
+        client_ids (list[str]): 客户端ID列表
+    """
+    for client_id, key in generate_keys(client_ids).items():
+        print(f"Client ID: {client_id}, Generated key: {key}")
+
+
 @typer_app.command()
 def run(host: str = "0.0.0.0"):
     server_app.run(host)
@@ -97,11 +208,8 @@ def del_client(client_id):
     Args:
         client_id (str): 客户端ID
     """
-    conn = sqlite3.connect('keys.db')
-    c = conn.cursor()
-    c.execute("DELETE FROM keys WHERE client_id = ?", (client_id,))
-    conn.commit()
-    conn.close()
+    with _connection(write=True) as conn:
+        conn.execute("DELETE FROM keys WHERE client_id = ?", (client_id,))
 
 
 if __name__ == '__main__':
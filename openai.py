@@ -1,10 +1,13 @@
 # 定义泛型类型变量
+import functools
 import json
 from dataclasses import field
 from typing import TypeVar, Type, List, Optional
 
+import pydantic_core
 import requests
 from addict import Dict
+from requests.adapters import HTTPAdapter
 from pydantic import BaseModel
 
 from pyext.io import AudioFile
@@ -12,6 +15,21 @@ from pyext.io import AudioFile
 T = TypeVar('T', bound=BaseModel)
 
 
+@functools.lru_cache(maxsize=None)
+def _import_multipart_encoder():
+    """
+    导入可选依赖requests_toolbelt中的MultipartEncoder,安装后上传文件时从磁盘流式读取,不需要把整个文件读入内存
+
+    Returns:
+        MultipartEncoder类,未安装时返回None
+    """
+    try:
+        from requests_toolbelt import MultipartEncoder
+    except ImportError:
+        return None
+    return MultipartEncoder
+
+
 class ImageData(BaseModel):
     revised_prompt: Optional[str] = None
     """修改后的提示"""
@@ -150,6 +168,18 @@ class OpenAiClient:
     def __init__(self, base_url: str, key: str):
         self.base_url = base_url
         self.key = key
+        self._session = requests.Session()
+        """复用的HTTP会话,多次请求之间保持连接,不需要每次重新进行TCP和TLS握手"""
+        self._session.headers['Authorization'] = f'Bearer {key}'
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    def close(self):
+        """
+        关闭HTTP会话中保持的连接
+        """
+        self._session.close()
 
     def stt(self, audio_file: AudioFile):
         """
@@ -161,14 +191,18 @@ class OpenAiClient:
             str: 文字
         """
         url = f"{self.base_url}audio/transcriptions"
-        headers = {
-            'Authorization': f'Bearer {self.key}'
-        }
-        payload = {'model': 'whisper-1'}
-        files = [
-            ('file', (audio_file.name, open(audio_file.path, 'rb'), 'audio/mpeg'))
-        ]
-        response = requests.request("POST", url, headers=headers, data=payload, files=files)
+        multipart_encoder = _import_multipart_encoder()
+        with open(audio_file.path, 'rb') as file:
+            if multipart_encoder is None:
+                # requests会把整个文件读入内存后再编码请求体
+                response = self._session.post(url, data={'model': 'whisper-1'},
+                                              files=[('file', (audio_file.name, file, 'audio/mpeg'))])
+            else:
+                body = multipart_encoder(fields={
+                    'model': 'whisper-1',
+                    'file': (audio_file.name, file, 'audio/mpeg')
+                })
+                response = self._session.post(url, data=body, headers={'Content-Type': body.content_type})
 
         return Dict(response.json()).text
 
@@ -184,13 +218,27 @@ class OpenAiClient:
         """
         url = f"{self.base_url}chat/completions"
         headers = {
-            'Authorization': f'Bearer {self.key}',
             'Content-Type': 'application/json; charset=utf-8'
         }
 
-        response = requests.request("POST", url, headers=headers, data=request.model_dump_json(), timeout=(10, 600))
+        # 直接发送pydantic-core序列化得到的utf-8 bytes,响应体也直接校验为模型,不经过中间的dict
+        response = self._session.post(url, headers=headers, data=pydantic_core.to_json(request), timeout=(10, 600))
         response.raise_for_status()
-        return ChatCompletion(**response.json())
+        return ChatCompletion.model_validate_json(response.content)
+
+
+@functools.lru_cache(maxsize=128)
+def _schema_json(model: Type[BaseModel]) -> str:
+    """
+    获取 Pydantic 类型的 json schema 字符串,每个类型只生成一次
+
+    Args:
+        model (Type[BaseModel]): Pydantic 类型
+
+    Returns:
+        str: 不带缩进的 json schema
+    """
+    return json.dumps(model.model_json_schema(), ensure_ascii=False)
 
 
 def generate_pydantic_instance(open_client: OpenAiClient, prompt: str, model: Type[T]) -> T:
@@ -209,7 +257,7 @@ def generate_pydantic_instance(open_client: OpenAiClient, prompt: str, model: Ty
     response = open_client.chat_completion(ChatRequest(
         model="gpt-4o-mini",
         messages=[Message.user_say(
-            f"""{prompt},返回的数据需要符合以下 json schema: {json.dumps(model.model_json_schema(), indent=4)}""")],
+            f"""{prompt},返回的数据需要符合以下 json schema: {_schema_json(model)}""")],
         response_format={"type": "json_object"}
     ))
     # print(response)
@@ -217,6 +265,4 @@ def generate_pydantic_instance(open_client: OpenAiClient, prompt: str, model: Ty
     result_text = response.choices[0].message.content.strip()
 
     # 解析 JSON 数据为 Pydantic 实例
-    data_dict = json.loads(result_text)
-    instance = model(**data_dict)
-    return instance
+    return model.model_validate_json(result_text)
@@ -1,8 +1,9 @@
-import traceback
+import functools
+import inspect
+import itertools
 import uuid
 from typing import Callable, Any, Optional
 
-import wrapt
 from loguru import logger
 from pydantic import BaseModel
 
@@ -25,6 +26,25 @@ class Stage(BaseModel):
     def to_dict(self):
         return {"name": self.name, "message": self.message}
 
+    @functools.cached_property
+    def cached_dict(self) -> dict:
+        """
+        阶段的字典表示,第一次访问时生成后缓存在实例上,同一个阶段广播给多个任务时只生成一次。
+        修改阶段的字段或者复制阶段时缓存会失效,返回的字典不应修改
+        """
+        return self.to_dict()
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in ("name", "message"):
+            self.__dict__.pop("cached_dict", None)
+
+    def model_copy(self, *, update=None, deep=False):
+        copied = super().model_copy(update=update, deep=deep)
+        # model_copy会复制实例的__dict__,其中可能包含原阶段已经缓存的字典
+        copied.__dict__.pop("cached_dict", None)
+        return copied
+
     @property
     def is_completed(self):
         """
@@ -74,10 +94,40 @@ class Stage(BaseModel):
 
 
 # region 任务树模型
+_TASK_ID_PREFIX = uuid.uuid4().hex
+""" 任务ID的前缀,每个进程只生成一次,保证不同进程创建的任务ID也不会重复 """
+_task_id_counter = itertools.count()
+""" 任务ID的序号 """
+
+
+def _count_positional_params(func: Callable) -> int:
+    """
+    统计函数可以接收的位置参数个数,无法获取签名或者接收可变位置参数时返回-1
+
+    Args:
+        func (Callable): 函数
+
+    Returns:
+        int: 位置参数个数
+    """
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return -1
+    count = 0
+    for parameter in parameters:
+        if parameter.kind == inspect.Parameter.VAR_POSITIONAL:
+            return -1
+        if parameter.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD):
+            count += 1
+    return count
+
+
 class Task:
     """
     表示一个任务
     """
+    __slots__ = ("title", "executable", "context", "children", "parent", "id", "stage")
 
     def __init__(
             self,
@@ -97,7 +147,7 @@ class Task:
         """ 子任务 """
         self.parent = parent
         """ 父任务 """
-        self.id = str(uuid.uuid4())
+        self.id = f"{_TASK_ID_PREFIX}-{next(_task_id_counter)}"
         """ 任务的唯一标识 """
         self.stage: Stage | None = None
         """ 任务当前所在的阶段 """
@@ -106,14 +156,13 @@ class Task:
         """
         返回此任务的所有祖先任务的列表，按从最远祖先到最近祖先的顺序排列
         """
-
-        def collect_ancestors(task: "Task", ancestors: list["Task"]):
-            if task.parent:
-                collect_ancestors(task.parent, ancestors)
-                ancestors.append(task.parent)
-
+        # 沿父任务链向上收集,然后反转为从最远祖先开始的顺序
         result = []
-        collect_ancestors(self, result)
+        parent = self.parent
+        while parent:
+            result.append(parent)
+            parent = parent.parent
+        result.reverse()
         return result
 
     def to_dict(self) -> dict:
@@ -123,53 +172,74 @@ class Task:
         Returns:
             dict: 任务的字典表示
         """
-        return {
-            "id": self.id,
-            "title": self.title,
-            "stage": self.stage.to_dict() if self.stage else None,
-            "children": (
-                [child.to_dict() for child in self.children] if self.children else None
-            ),
-        }
+
+        def to_node_dict(task: "Task") -> dict:
+            return {
+                "id": task.id,
+                "title": task.title,
+                "stage": task.stage.cached_dict if task.stage else None,
+                "children": None,
+            }
+
+        # 使用显式栈逐层填充子任务的字典,不递归调用
+        result = to_node_dict(self)
+        pending = [(self, result)]
+        while pending:
+            task, task_dict = pending.pop()
+            if task.children:
+                children = [(child, to_node_dict(child)) for child in task.children]
+                task_dict["children"] = [child_dict for _, child_dict in children]
+                pending.extend(children)
+        return result
 
     def organize_hierarchy(self):
         """
         梳理该任务及其子任务的层次结构
         """
-        if self.children:
-            for child in self.children:
-                child.organize_hierarchy()
-                child.parent = self
+        # 使用显式栈逐层设置子任务的父任务,不递归调用,层级很深时也不会超出递归深度限制
+        pending = [self]
+        while pending:
+            task = pending.pop()
+            if task.children:
+                for child in task.children:
+                    child.parent = task
+                pending.extend(task.children)
 
     # region 执行任务树
     def run_sync(
-            self, on_stage_change: Callable[[Stage, "Task"], None] = None, last_result=None
+            self,
+            on_stage_change: Callable[[Stage, "Task"], None] | Callable[[list[tuple[Stage, "Task"]]], None] = None,
+            last_result=None
     ) -> Any:
         """
         并行执行此任务及其子任务,任务的执行顺序由放入任务树的顺序决定
 
         Args:
-            on_stage_change (Callable[[Stage], None], optional): 阶段变化时的回调函数. Defaults to None.
+            on_stage_change (Callable, optional): 阶段变化时的回调函数. Defaults to None.
+                接收(stage, task)两个参数时,祖先任务和当前任务各回调一次;
+                只接收一个参数时,每次阶段变化只回调一次,参数为从最远祖先到当前任务的(stage, task)列表
             last_result (Any, optional): 上一个任务的执行结果. Defaults to None.
 
         Returns:
             Any: 返回最后一个任务的执行结果
         """
         # 遍历任务树中包含有效执行函数的任务,遵从放入任务树的顺序
+        # 使用显式栈做先序遍历,子任务逆序入栈以保证先执行前面的子任务
         tasks: list[Task] = []
-
-        def _run_sync(task: "Task"):
+        pending = [self]
+        while pending:
+            task = pending.pop()
             if task.executable:
                 tasks.append(task)
             if task.children:
-                for child in task.children:
-                    _run_sync(child)
+                pending.extend(reversed(task.children))
 
-        _run_sync(self)
+        # 本次执行中已经查找过的任务上下文,同一条父任务链只需要向上查找一次
+        resolved_contexts: dict[Task, Any] = {}
 
         def find_context(task: "Task"):
             """
-            递归查找任务的上下文。如果任务本身有上下文,则返回该上下文;否则,递归查找父任务的上下文,直到找到根任务为止。
+            查找任务的上下文。如果任务本身有上下文,则返回该上下文;否则,沿父任务链向上查找,直到找到根任务为止。
 
             Args:
                 task (Task): 要查找上下文的任务
@@ -177,11 +247,25 @@ class Task:
             Returns:
                 Any: 任务的上下文,如果找不到则返回 None
             """
-            if task.context:
-                return task.context
-            if task.parent:
-                return find_context(task.parent)
-            return None
+            visited = []
+            context = None
+            while task:
+                if task in resolved_contexts:
+                    context = resolved_contexts[task]
+                    break
+                visited.append(task)
+                if task.context:
+                    context = task.context
+                    break
+                task = task.parent
+            for visited_task in visited:
+                resolved_contexts[visited_task] = context
+            return context
+
+        # 每个任务在执行过程中会多次更新阶段,本次执行中祖先任务列表只计算一次
+        ancestors_cache: dict[Task, list[Task]] = {}
+        # 回调函数只接收一个参数时,一次阶段变化的所有(stage, task)合并为一次回调
+        batched = on_stage_change is not None and _count_positional_params(on_stage_change) == 1
 
         def update_stage(task: Task, stage: Stage):
             """
@@ -189,12 +273,21 @@ class Task:
             """
             task.stage = stage
             if on_stage_change:
-                for ancesto_task in task.get_ancestors():
-                    stage_dict = stage.model_dump()
-                    stage_dict["message"] = None
-                    ancesto_task.stage = Stage(**stage_dict)
-                    on_stage_change(ancesto_task.stage, ancesto_task)
-                on_stage_change(stage, task)
+                ancestors = ancestors_cache.get(task)
+                if ancestors is None:
+                    ancestors = ancestors_cache[task] = task.get_ancestors()
+                # 祖先任务的阶段只是去掉了信息,所有祖先共用同一个实例,cached_dict也只会生成一次
+                ancestor_stage = Stage(name=stage.name, data=stage.data, error=stage.error)
+                for ancesto_task in ancestors:
+                    ancesto_task.stage = ancestor_stage
+                if batched:
+                    changes = [(ancestor_stage, ancesto_task) for ancesto_task in ancestors]
+                    changes.append((stage, task))
+                    on_stage_change(changes)
+                else:
+                    for ancesto_task in ancestors:
+                        on_stage_change(ancestor_stage, ancesto_task)
+                    on_stage_change(stage, task)
 
         last_error = None
         try:
@@ -204,8 +297,8 @@ class Task:
                     last_result = task.executable(find_context(task), last_result)
                     update_stage(task, Stage.success(f"Task [{task.title}] succeeded."))
                 except Exception as e:
-                    logger.error(str(e))
-                    traceback.print_exc()
+                    # 由loguru在输出时格式化异常堆栈,不再额外向stderr打印一次
+                    logger.opt(exception=e).error(str(e))
                     update_stage(task, Stage.failed(f"Task [{task.title}] failed.", e))
                     last_error = e
                     raise e
@@ -229,20 +322,99 @@ class Task:
 
 
 # region 任务装饰器
-def task(title: str, context: Any = None, dependencies: list[Callable] = None):
-    @wrapt.decorator
-    def decorator(wrapped, instance, args, kwargs):
-
-        if dependencies:
-            root_task = Task(title, None, context)
-            dependent_tasks: list[Task] = [f() for f in dependencies]
-            for dependent_task in dependent_tasks:
-                dependent_task.parent = root_task
-            dependent_tasks.append(Task(title, wrapped, parent=root_task))
-            root_task.children = dependent_tasks
-            return root_task
-        else:
-            return Task(title, wrapped, context)
+@functools.lru_cache(maxsize=None)
+def _import_numba():
+    """
+    导入可选依赖numba,未安装时返回None
+
+    Returns:
+        numba模块,未安装时返回None
+    """
+    try:
+        import numba
+        import numba.core.errors
+    except ImportError:
+        return None
+    return numba
+
+
+@functools.lru_cache(maxsize=None)
+def _jit_compile(func: Callable) -> Callable:
+    """
+    使用numba把执行函数编译为机器码,每个函数只包装一次。numba在第一次调用时才会编译,编译结果会缓存到磁盘
+
+    numba只能编译参数为数值或数组的函数,执行函数的参数(上下文和上一个任务的结果)无法推断类型时,
+    输出一次警告后改为以普通Python函数运行
+
+    Args:
+        func (Callable): 执行函数
+
+    Returns:
+        Callable: 编译后的执行函数,未安装numba时返回原函数
+    """
+    numba = _import_numba()
+    if numba is None:
+        logger.warning(f"未安装numba,任务执行函数[{func.__name__}]将以普通Python函数运行")
+        return func
+    target = numba.njit(cache=True)(func)
+
+    @functools.wraps(func)
+    def executable(*args):
+        nonlocal target
+        try:
+            return target(*args)
+        except numba.core.errors.TypingError:
+            # 类型推断失败发生在编译阶段,执行函数还没有运行,可以直接改用原函数重新执行
+            if target is func:
+                raise
+            logger.warning(f"numba无法编译任务执行函数[{func.__name__}],将以普通Python函数运行")
+            target = func
+            return func(*args)
+
+    return executable
+
+
+def task(title: str, context: Any = None, dependencies: list[Callable] = None, jit: bool = False,
+         static_deps: bool = False):
+    """
+    把函数声明为任务,调用被装饰的函数时返回任务而不是执行它
+
+    Args:
+        title (str): 任务的标题
+        context (Any, optional): 任务的上下文. Defaults to None.
+        dependencies (list[Callable], optional): 依赖的任务,会在此任务之前执行. Defaults to None.
+        jit (bool, optional): 是否使用numba编译执行函数. Defaults to False.
+            只适用于纯数值计算的执行函数,上下文和上一个任务的结果只能是None、数值、元组或numpy数组,
+            不能是字典或Pydantic模型等普通Python对象,否则会输出一次警告并以普通Python函数运行
+        static_deps (bool, optional): 依赖的任务是否固定不变. 为True时只在第一次调用时构建一次任务树,
+            之后每次调用都返回同一个任务树,同一时间只能执行其中一个. Defaults to False.
+    """
+
+    def decorator(wrapped):
+        executable = _jit_compile(wrapped) if jit else wrapped
+
+        def build_task() -> Task:
+            if dependencies:
+                root_task = Task(title, None, context)
+                dependent_tasks: list[Task] = [f() for f in dependencies]
+                for dependent_task in dependent_tasks:
+                    dependent_task.parent = root_task
+                dependent_tasks.append(Task(title, executable, parent=root_task))
+                root_task.children = dependent_tasks
+                return root_task
+            else:
+                return Task(title, executable, context)
+
+        if static_deps:
+            # 依赖的任务固定不变时,整个任务树只构建一次,不必每次调用都重新执行依赖的任务工厂
+            build_task = functools.lru_cache(maxsize=None)(build_task)
+
+        # 被装饰的函数只作为任务的执行函数,调用时只创建任务而不执行它,用普通闭包包装即可
+        @functools.wraps(wrapped)
+        def inner(*args, **kwargs):
+            return build_task()
+
+        return inner
 
     return decorator
 
@@ -1,11 +1,15 @@
+import functools
 import os
+import threading
+import time
+import tkinter as tk
 import winreg
+from tkinter import messagebox
 
 import win32gui
-import wrapt
 from clicknium import clicknium as cc, ui
 from loguru import logger
-from tenacity import retry, stop_after_delay, wait_fixed
+from tenacity import retry, stop_after_delay, wait_exponential
 from win32comext.shell import shell, shellcon
 
 
@@ -44,33 +48,45 @@ def open_file_dialog(title="请选择文件"):
     return None
 
 
+_tk_local = threading.local()
+"""每个线程各自的隐藏主窗口,Tk不是线程安全的,主窗口只能在创建它的线程中使用"""
+
+_MESSAGE_BOXES = {
+    "info": (messagebox.showinfo, "提示"),
+    "warning": (messagebox.showwarning, "警告"),
+    "error": (messagebox.showerror, "错误"),
+    "question": (messagebox.askquestion, "问题"),
+}
+"""消息框类型到(显示函数, 标题)的映射"""
+
+
 def show_message_box(msg, callback=None, type="info"):
-    root = tk.Tk()
-    root.withdraw()  # 隐藏主窗口
-
-    if type == "info":
-        res = messagebox.showinfo("提示", msg)
-    elif type == "warning":
-        res = messagebox.showwarning("警告", msg)
-    elif type == "error":
-        res = messagebox.showerror("错误", msg)
-    elif type == "question":
-        res = messagebox.askquestion("问题", msg)
-    else:
-        res = messagebox.showinfo("提示", msg)
+    # 创建Tk主窗口需要初始化Tcl解释器,每个线程只创建一次并一直隐藏
+    root = getattr(_tk_local, "root", None)
+    if root is None:
+        root = _tk_local.root = tk.Tk()
+        root.withdraw()  # 隐藏主窗口
+
+    show, title = _MESSAGE_BOXES.get(type, _MESSAGE_BOXES["info"])
+    res = show(title, msg, parent=root)
     # 或者使用其他类型的消息框:
     # messagebox.showwarning("警告", "这是一个警告框！")
     # messagebox.showerror("错误", "这是一个错误框！")
     if callback:
         callback(res)
-    root.destroy()
+
+
+_THEME_CACHE_TTL = 5
+"""主题缓存的有效时间(秒)"""
+_theme_cache: tuple[float, str] | None = None
+"""最近一次读取的主题,(读取时间, 主题类型)"""
 
 
 def get_windows_theme():
     """
     获取当前系统使用的主题
 
-    仅限win11
+    仅限win11,读取结果会缓存5秒,期间重复调用不再读取注册表
 
     Returns:
         str: 主题类型,Dark Theme或Light Theme
@@ -78,6 +94,11 @@ def get_windows_theme():
     Raises:
         WindowsError: 如果无法确定主题类型,则引发此异常
     """
+    global _theme_cache
+    now = time.monotonic()
+    if _theme_cache is not None and now - _theme_cache[0] < _THEME_CACHE_TTL:
+        return _theme_cache[1]
+
     # 打开注册表键
     key = winreg.OpenKey(winreg.HKEY_CURRENT_USER,
                          r"Software\Microsoft\Windows\CurrentVersion\Themes\Personalize")
@@ -90,9 +111,15 @@ def get_windows_theme():
 
     # 根据值返回主题类型
     if value == 0:
-        return "Dark Theme"
+        theme = "Dark Theme"
     else:
-        return "Light Theme"
+        theme = "Light Theme"
+    _theme_cache = (now, theme)
+    return theme
+
+
+_window_handles: dict[str, int] = {}
+""" 窗口标题到窗口句柄的缓存 """
 
 
 def is_window_active(window_title):
@@ -107,12 +134,27 @@ def is_window_active(window_title):
     """
     # 获取当前激活窗口的句柄
     active_window = win32gui.GetForegroundWindow()
+    if not active_window:
+        return False
+
+    # 缓存的句柄只在窗口被销毁后才重新查找
+    window = _window_handles.get(window_title)
+    if window is None or not win32gui.IsWindow(window):
+        window = win32gui.FindWindow(None, window_title)
+        if window:
+            _window_handles[window_title] = window
+        else:
+            _window_handles.pop(window_title, None)
 
-    # 获取窗口标题
-    active_title = win32gui.GetWindowText(active_window)
+    # 直接比较窗口句柄,不需要跨进程读取激活窗口的标题
+    if active_window == window:
+        return True
 
-    # 比较窗口标题
-    return active_title == window_title
+    # 可能有多个同名窗口,句柄不同时仍然比较激活窗口的标题
+    if win32gui.GetWindowText(active_window) == window_title:
+        _window_handles[window_title] = active_window
+        return True
+    return False
 
 
 def wait_win(locator, timeout=0, interval=1):
@@ -121,40 +163,53 @@ def wait_win(locator, timeout=0, interval=1):
     Args:
         locator: clicknium定位符
         timeout: 超时时间,默认不会超时,一直等待
-        interval: 等待间隔,默认1秒
+        interval: 最长等待间隔,默认1秒;检查间隔从0.1秒开始逐渐增加到该值,窗口很快出现时不需要等满一个间隔
     """
     window_name = str(locator).split(".")[-1]
-
-    @retry(stop=stop_after_delay(timeout if timeout > 0 else 86400), wait=wait_fixed(interval))
+    poll_wait = wait_exponential(multiplier=0.1, min=0.1, max=interval)
+    stop = stop_after_delay(timeout if timeout > 0 else 86400)
+    # 日志和异常信息在每次检查时都相同,只格式化一次
+    waiting_exists_message = f"正在等待窗口[{window_name}]出现..."
+    not_exists_message = f"窗口[{window_name}]未打开"
+    waiting_active_message = f"正在等待窗口[{window_name}]处于活动状态..."
+
+    @retry(stop=stop, wait=poll_wait, reraise=True)
     def wait_window_exists():
         """
         等待窗口出现
         """
-        logger.info(f"正在等待窗口[{window_name}]出现...")
+        logger.info(waiting_exists_message)
         if not cc.is_existing(locator):
-            raise Exception(f"窗口[{window_name}]未打开")
+            raise Exception(not_exists_message)
         return True
 
-    @retry(stop=stop_after_delay(timeout if timeout > 0 else 86400), wait=wait_fixed(interval))
-    def wait_window_active():
+    @retry(stop=stop, wait=poll_wait, reraise=True)
+    def wait_window_active(window, window_title: str):
         """
         等待窗口处于活动状态
+
+        Args:
+            window: 窗口元素
+            window_title: 窗口标题
         """
-        logger.info(f"正在等待窗口[{window_name}]处于活动状态...")
-        window = ui(locator)
-        window_title = window.get_property("Name")
+        logger.info(waiting_active_message)
         if not is_window_active(window_title):
             window.set_focus()
             raise Exception(f"窗口[{window_title}]未处于活动状态")
         return True
 
-    @wrapt.decorator
-    def decorator(wrapped, instance, args, kwargs):
-        window_exists = wait_window_exists()
-        logger.info(f"窗口[{window_name}]已出现")
-        window_active = wait_window_active()
-        logger.info(f"窗口[{window_name}]已处于活动状态")
-        if window_exists and window_active:
-            return wrapped(*args, **kwargs)
+    def decorator(wrapped):
+        @functools.wraps(wrapped)
+        def inner(*args, **kwargs):
+            window_exists = wait_window_exists()
+            logger.info(f"窗口[{window_name}]已出现")
+            # 窗口出现后只查找一次窗口元素和标题,等待激活的每次检查只比较前台窗口的句柄
+            window = ui(locator)
+            window_active = wait_window_active(window, window.get_property("Name"))
+            logger.info(f"窗口[{window_name}]已处于活动状态")
+            if window_exists and window_active:
+                return wrapped(*args, **kwargs)
+
+        return inner
 
     return decorator